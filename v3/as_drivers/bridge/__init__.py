@@ -0,0 +1 @@
+from .bridge import *
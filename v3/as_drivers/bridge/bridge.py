@@ -0,0 +1,191 @@
+# bridge.py Link message brokers on different nodes over a stream
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# A Bridge is a Broker agent linking the local Broker to a Broker at the other
+# end of a stream (UART, socket...). Frames are exchanged using FrameStream. Each
+# frame is a list of records:
+# [0, topic, message, origin, hops] A publication.
+# [1, topic] Subscribe: the peer wants messages matching topic.
+# [2, topic] Unsubscribe.
+# A node imports topics from its peer by sending subscribe records. Topics
+# requested by a peer are imported from the node's other peers, so brokers linked
+# in a tree act as one bus.
+# Loop prevention: a message is never returned to the bridge it came from, is
+# dropped on returning to its origin node, and is dropped after maxhops bridges.
+
+import asyncio
+from random import getrandbits
+from primitives import Agent, broker as _broker
+from as_drivers.framing import FrameStream, LenPrefix, Packed
+
+__all__ = ("Bridge",)
+
+
+class _Node:  # State shared by the bridges of one Broker
+    def __init__(self, broker):
+        self.broker = broker
+        self.id = getrandbits(30)
+        self.bridges = []
+        self.ctx = None  # (source bridge, origin, hops) during an inbound publication
+
+
+_nodes = []
+
+
+def _node(broker):
+    for node in _nodes:
+        if node.broker is broker:
+            return node
+    node = _Node(broker)
+    _nodes.append(node)
+    return node
+
+
+class Bridge(Agent):
+    # stream: an object supported by FrameStream. topics: topics (which may be
+    # wildcards) to import from the peer. broker: default primitives.broker.
+    # batch_ms: publications within this period share a frame. maxpending:
+    # records queued for transmission beyond this number are dropped.
+    def __init__(
+        self, stream, topics=(), broker=None, mode=None, bufsize=512, batch_ms=5, maxpending=64, maxhops=8
+    ):
+        self._broker = _broker if broker is None else broker
+        self._node = _node(self._broker)
+        self._fs = FrameStream(stream, LenPrefix() if mode is None else mode, Packed, bufsize, bufsize)
+        self._imports = {t: 1 for t in topics}  # topic: reference count
+        self._exports = set()  # Topics requested by the peer
+        self._batch_ms = batch_ms
+        self._maxpending = maxpending
+        self._maxhops = maxhops
+        self._tx = []  # Records awaiting transmission
+        self._txev = asyncio.Event()
+        self._wtask = None
+        self.sent = 0  # Statistics: records sent and received
+        self.received = 0
+        self.frames = 0  # Frames sent
+        self.dropped = 0  # Records lost because the link could not keep up
+
+    def _queue(self, rec):
+        if len(self._tx) < self._maxpending:
+            self._tx.append(rec)
+            self._txev.set()
+        else:
+            self.dropped += 1
+
+    # Called by the local Broker for topics exported to the peer
+    def put(self, topic, message, *args):
+        node = self._node
+        if (ctx := node.ctx) is None:  # Local publication
+            self._queue([0, topic, message, node.id, 0])
+        elif ctx[0] is not self and ctx[2] < self._maxhops:
+            self._queue([0, topic, message, ctx[1], ctx[2]])
+
+    def _import(self, topic):
+        n = self._imports.get(topic, 0) + 1
+        self._imports[topic] = n
+        if n == 1:
+            self._queue([1, topic])
+
+    def _unimport(self, topic):
+        n = self._imports.get(topic, 0) - 1
+        if n > 0:
+            self._imports[topic] = n
+        elif n == 0:
+            del self._imports[topic]
+            self._queue([2, topic])
+
+    def _rx(self, rec):
+        node = self._node
+        kind = rec[0]
+        if kind == 0:
+            self.received += 1
+            _, topic, message, origin, hops = rec
+            if origin != node.id:
+                node.ctx = (self, origin, hops + 1)
+                try:
+                    self._broker.publish(topic, message)
+                finally:
+                    node.ctx = None
+        elif kind == 1:
+            if (topic := rec[1]) not in self._exports:
+                self._exports.add(topic)
+                self._broker.subscribe(topic, self)
+                for b in node.bridges:
+                    if b is not self:
+                        b._import(topic)  # Propagate the subscription
+        elif kind == 2:
+            if (topic := rec[1]) in self._exports:
+                self._unexport(topic)
+
+    def _unexport(self, topic):
+        self._exports.discard(topic)
+        self._broker.unsubscribe(topic, self)
+        for b in self._node.bridges:
+            if b is not self:
+                b._unimport(topic)
+
+    # Encode records into as few frames as possible. A record which can't be
+    # encoded (unsupported type, too long) is dropped without affecting others.
+    async def _frame(self, recs):
+        fs = self._fs
+        try:
+            fs.put(recs)
+        except IndexError:
+            if fs.pending():  # Make room
+                await fs.drain()
+                await self._frame(recs)
+                return
+        except Exception:  # Encoding failed: locate the culprit
+            pass
+        else:
+            self.frames += 1
+            self.sent += len(recs)
+            return
+        if len(recs) == 1:  # Record can never be sent
+            self.dropped += 1
+        else:
+            n = len(recs) // 2
+            await self._frame(recs[:n])
+            await self._frame(recs[n:])
+
+    async def _writer(self):
+        try:
+            while True:
+                await self._txev.wait()
+                self._txev.clear()
+                if self._batch_ms:
+                    await asyncio.sleep_ms(self._batch_ms)  # Accumulate a batch
+                recs = self._tx
+                self._tx = []
+                await self._frame(recs)
+                await self._fs.drain()
+        except OSError:  # Peer has gone: the reader will see EOF
+            pass
+
+    # Run the bridge until the peer closes the link or close() is called.
+    async def run(self):
+        node = self._node
+        for topic in self._imports:
+            self._queue([1, topic])
+        for b in node.bridges:  # Import topics requested by other peers
+            for topic in b._exports:
+                self._import(topic)
+        node.bridges.append(self)
+        self._wtask = asyncio.create_task(self._writer())
+        try:
+            async for frame in self._fs:
+                for rec in frame:
+                    self._rx(rec)
+        except (OSError, EOFError, ValueError, IndexError):
+            pass
+        finally:
+            node.bridges.remove(self)
+            for topic in list(self._exports):
+                self._unexport(topic)
+            self._wtask.cancel()
+
+    async def close(self):
+        self._fs.close()
+        await self._fs.wait_closed()
@@ -0,0 +1,135 @@
+# bridge_test.py Demo/test of Bridge linking brokers over TCP
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Runs on the Unix build or on any networked target.
+# Single process, three brokers (a hub with two leaves) on localhost:
+# import as_drivers.bridge.bridge_test as bt
+# bt.test()
+# Separate processes (or hosts), each with its own broker:
+# bt.hub()  # In one terminal
+# bt.leaf("127.0.0.1", "a")  # In others
+# bt.leaf("127.0.0.1", "b")
+
+import asyncio
+from primitives import Broker
+from primitives import broker as default_broker
+from .bridge import Bridge
+
+PORT = 8125
+
+
+async def serve(broker, topics=(), host="0.0.0.0"):  # Accept any number of leaves
+    async def conn(sr, sw):
+        await Bridge(sr, topics, broker=broker).run()
+
+    return await asyncio.start_server(conn, host, PORT)
+
+
+async def connect(broker, host, topics):
+    sr, _ = await asyncio.open_connection(host, PORT)
+    bridge = Bridge(sr, topics, broker=broker)
+    asyncio.create_task(bridge.run())
+    return bridge
+
+
+def logger(name, log):
+    def agent(topic, message):
+        log.append((name, topic, message))
+
+    return agent
+
+
+async def main():
+    hub = Broker()
+    leaf_a = Broker()
+    leaf_b = Broker()
+    log = []
+    server = await serve(hub, ("cmd/+",), "127.0.0.1")  # Hub imports commands
+    bra = await connect(leaf_a, "127.0.0.1", ("sensor/#",))
+    brb = await connect(leaf_b, "127.0.0.1", ("sensor/#",))
+    leaf_a.subscribe("sensor/#", logger("a", log))
+    leaf_b.subscribe("sensor/#", logger("b", log))
+    hub.subscribe("cmd/+", logger("hub", log))
+    await asyncio.sleep_ms(100)  # Allow subscriptions to propagate
+
+    hub.publish("sensor/hub", 1)  # Reaches both leaves
+    leaf_a.publish("sensor/a", 2)  # Reaches b via the hub, is not echoed to a
+    leaf_b.publish("cmd/go", 3)  # Reaches the hub only
+    await asyncio.sleep_ms(100)
+    exp = [("a", "sensor/a", 2), ("a", "sensor/hub", 1), ("b", "sensor/a", 2), ("b", "sensor/hub", 1)]
+    exp.append(("hub", "cmd/go", 3))
+    print("Routing", "Pass" if sorted(log) == sorted(exp) else "Fail {}".format(sorted(log)))
+
+    log.clear()
+    sent, frames = bra.sent, bra.frames
+    for n in range(50):  # Burst is batched into few frames
+        leaf_a.publish("sensor/burst", n)
+    await asyncio.sleep_ms(200)
+    got = [m for name, _, m in log if name == "b"]
+    print("Burst", "Pass" if got == list(range(50)) else "Fail {}".format(got))
+    print("Leaf a sent {} records in {} frames".format(bra.sent - sent, bra.frames - frames))
+
+    log.clear()
+    dropped = bra.dropped
+    leaf_a.publish("sensor/bad", {1, 2})  # A set can't be encoded
+    leaf_a.publish("sensor/big", "x" * 70_000)  # Too long to encode
+    leaf_a.publish("sensor/good", 5)  # The link is unaffected
+    await asyncio.sleep_ms(100)
+    got = [m for name, _, m in log if name == "b"]
+    ok = got == [5] and bra.dropped - dropped == 2
+    print("Encode error", "Pass" if ok else "Fail {} {}".format(len(got), bra.dropped - dropped))
+
+    await bra.close()  # Leaf a leaves the bus
+    await asyncio.sleep_ms(100)
+    log.clear()
+    leaf_b.publish("sensor/b", 4)
+    await asyncio.sleep_ms(100)
+    print("Disconnect", "Pass" if log == [("b", "sensor/b", 4)] else "Fail {}".format(log))
+    await brb.close()
+    server.close()
+    await server.wait_closed()
+
+
+def test():
+    try:
+        asyncio.run(main())
+    finally:
+        asyncio.new_event_loop()
+
+
+async def run_hub():
+    default_broker.subscribe("leaf/#", lambda t, m: print("hub got", t, m))
+    await serve(default_broker, ("leaf/#",))
+    n = 0
+    while True:
+        await asyncio.sleep(1)
+        default_broker.publish("hub/count", n)
+        n += 1
+
+
+async def run_leaf(host, name):
+    default_broker.subscribe("hub/#", lambda t, m: print(name, "got", t, m))
+    default_broker.subscribe("leaf/#", lambda t, m: print(name, "got", t, m))
+    bridge = Bridge((await asyncio.open_connection(host, PORT))[0], ("hub/#", "leaf/#"))  # Other leaves via the hub
+    asyncio.create_task(bridge.run())
+    n = 0
+    while True:
+        await asyncio.sleep(1)
+        default_broker.publish("leaf/{}".format(name), n)
+        n += 1
+
+
+def hub():
+    try:
+        asyncio.run(run_hub())
+    finally:
+        asyncio.new_event_loop()
+
+
+def leaf(host="127.0.0.1", name="leaf"):
+    try:
+        asyncio.run(run_leaf(host, name))
+    finally:
+        asyncio.new_event_loop()
@@ -0,0 +1,173 @@
+# loadgen.py Load generator for asyncio stream servers
+
+# Released under the MIT licence
+# Copyright (c) Peter Hinch 2026
+
+# Opens many concurrent connections to a server which echoes newline terminated
+# messages (e.g. userver.py) and reports throughput and latency percentiles.
+# Intended for the Unix build, to compare changes to the scheduler and I/O queue.
+# Usage:
+# import loadgen
+# loadgen.test()  # Runs a local echo server and measures it
+# loadgen.run("127.0.0.1", 8123, nconns=1000)  # Measure an external server
+# Linux limits the number of open files: ulimit -n 4096 may be necessary.
+
+import asyncio
+from array import array
+from time import ticks_us, ticks_ms, ticks_diff, ticks_add
+
+
+# Log-linear latency histogram. Values < 16μs have their own bucket, thereafter
+# each power of two is divided into 16 buckets: worst case error is ~6%.
+class Histogram:
+    SUB = 16
+
+    def __init__(self):
+        self._h = array("I", (0 for _ in range(self.SUB * 32)))
+        self.count = 0
+        self.max = 0
+
+    def _index(self, v):
+        if v < self.SUB:
+            return v
+        e = 0
+        while (v >> e) >= 2 * self.SUB:
+            e += 1
+        return self.SUB * (e + 1) + (v >> e) - self.SUB
+
+    def _value(self, idx):  # Lowest value held in a bucket
+        if idx < self.SUB:
+            return idx
+        e = idx // self.SUB - 1
+        return (self.SUB + idx % self.SUB) << e
+
+    def add(self, v):
+        self._h[self._index(max(v, 0))] += 1
+        self.count += 1
+        self.max = max(self.max, v)
+
+    def percentile(self, p):  # p in range 0-100
+        target = self.count * p / 100
+        n = 0
+        for idx, c in enumerate(self._h):
+            n += c
+            if c and n >= target:
+                return self._value(idx)
+        return self.max
+
+    def show(self, rows=12):  # Coarse ASCII histogram
+        if not self.count:
+            return
+        lo = self._index(self.percentile(0.1))
+        hi = self._index(self.max) + 1
+        step = max(1, (hi - lo + rows - 1) // rows)
+        counts = [sum(self._h[i : i + step]) for i in range(lo, hi, step)]
+        top = max(counts)
+        for n, c in enumerate(counts):
+            print("{:>10d}μs {:>8d} {}".format(self._value(lo + n * step), c, "#" * (40 * c // top)))
+
+
+class _Stats:
+    def __init__(self, t0, tend):
+        self.t0 = t0  # Start of measurement: the end of the ramp
+        self.tend = tend
+        self.hist = Histogram()
+        self.nbytes = 0
+        self.errors = 0
+        self.connected = 0
+
+
+# Each connection is closed loop: it has one request outstanding at a time. With
+# a rate, requests are scheduled every period_us and latency is measured from
+# the scheduled time rather than the actual send. If the server falls behind,
+# the delay before a late request could be sent counts towards its latency so
+# that queueing is not hidden by the client pausing.
+async def _client(host, port, msg, period_us, stats):
+    try:
+        sr, sw = await asyncio.open_connection(host, port)
+    except OSError:
+        stats.errors += 1
+        return
+    stats.connected += 1
+    try:
+        tnext = ticks_us()  # Scheduled send time
+        while ticks_diff(stats.tend, ticks_ms()) > 0:
+            t = tnext if period_us else ticks_us()
+            sw.write(msg)
+            await sw.drain()
+            res = await sr.readline()
+            if not res:
+                raise OSError
+            if ticks_diff(ticks_ms(), stats.t0) >= 0:  # Ramp is over
+                stats.hist.add(ticks_diff(ticks_us(), t))
+                stats.nbytes += len(res)
+            if period_us:
+                tnext = ticks_add(tnext, period_us)
+                if (dt := ticks_diff(tnext, ticks_us())) > 0:
+                    await asyncio.sleep_ms(dt // 1000)
+                else:
+                    await asyncio.sleep_ms(0)  # Late: send at once
+            else:
+                await asyncio.sleep_ms(0)
+    except OSError:
+        stats.errors += 1
+    finally:
+        await sw.wait_closed()
+
+
+# nconns: number of concurrent connections. size: message length including the
+# newline. rate: requests/s per connection (0: as fast as possible).
+# duration: measurement period in secs. ramp_ms: period over which connections
+# open. Requests completing during the ramp are excluded from the results.
+async def loadgen(host="127.0.0.1", port=8123, nconns=100, size=64, rate=0, duration=10, ramp_ms=1000):
+    t0 = ticks_add(ticks_ms(), ramp_ms)
+    stats = _Stats(t0, ticks_add(t0, duration * 1000))
+    msg = b"x" * (size - 1) + b"\n"
+    period_us = 1_000_000 // rate if rate else 0
+    tasks = []
+    for n in range(nconns):
+        tasks.append(asyncio.create_task(_client(host, port, msg, period_us, stats)))
+        if ramp_ms and nconns > 1:
+            await asyncio.sleep_ms(ramp_ms // nconns)
+    await asyncio.gather(*tasks, return_exceptions=True)
+    secs = ticks_diff(ticks_ms(), t0) / 1000
+    h = stats.hist
+    print("Connections {} of {} errors {}".format(stats.connected, nconns, stats.errors))
+    print("Requests {} in {:.1f}s: {:.0f} req/s {:.0f} bytes/s".format(h.count, secs, h.count / secs, stats.nbytes / secs))
+    print("Latency p50 {}μs p99 {}μs p999 {}μs max {}μs".format(h.percentile(50), h.percentile(99), h.percentile(99.9), h.max))
+    h.show()
+    return stats
+
+
+# Minimal quiet echo server with the same protocol as userver.py
+async def echo_server(host="127.0.0.1", port=8123, backlog=100):
+    async def echo(sr, sw):
+        try:
+            while l := await sr.readline():
+                sw.write(l)
+                await sw.drain()
+        except OSError:
+            pass
+        await sr.wait_closed()
+
+    return await asyncio.start_server(echo, host, port, backlog)
+
+
+def run(host="127.0.0.1", port=8123, **kwargs):
+    try:
+        asyncio.run(loadgen(host, port, **kwargs))
+    finally:
+        asyncio.new_event_loop()
+
+
+def test(nconns=100, size=64, rate=0, duration=10):
+    async def main():
+        server = await echo_server(backlog=nconns)
+        await loadgen(nconns=nconns, size=size, rate=rate, duration=duration)
+        server.close()
+        await server.wait_closed()
+
+    try:
+        asyncio.run(main())
+    finally:
+        asyncio.new_event_loop()
@@ -0,0 +1 @@
+from .framing import *
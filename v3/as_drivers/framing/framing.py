@@ -0,0 +1,301 @@
+# framing.py Message framing for asyncio streams
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# A FrameStream wraps any object usable by asyncio.StreamReader/StreamWriter (UART,
+# socket, I2C Channel...) and exchanges discrete messages over it.
+# Incoming data is read into a single pre-allocated buffer and frames are parsed
+# in place. Outgoing frames are encoded into a second buffer and sent with one
+# write, so many small messages may share a single drain().
+
+import asyncio
+import struct
+import json
+
+__all__ = ("LenPrefix", "Delimited", "Raw", "Json", "Packed", "FrameStream")
+
+
+# Serialisers. encode(buf, i, obj) writes obj to bytearray buf at index i and
+# returns the index of the next free byte, raising IndexError if buf is too small.
+# decode(mv) is passed a memoryview of the payload and returns the message.
+
+
+def _room(buf, i, n):
+    if i + n > len(buf):
+        raise IndexError
+    return i + n
+
+
+class Raw:  # Payload is any bytes-like object.
+    @staticmethod
+    def encode(buf, i, obj):
+        n = _room(buf, i, len(obj))
+        buf[i:n] = obj
+        return n
+
+    # Returns a memoryview into the receive buffer: only valid until the next
+    # FrameStream.recv(). Copy with bytes(mv) if it must be retained.
+    @staticmethod
+    def decode(mv):
+        return mv
+
+
+class Json:  # Payload is any JSON serialisable object
+    @staticmethod
+    def encode(buf, i, obj):
+        return Raw.encode(buf, i, json.dumps(obj).encode())
+
+    @staticmethod
+    def decode(mv):
+        return json.loads(mv)
+
+
+# Compact binary encoding of None, bool, int, float, str, bytes, list, tuple and
+# dict. A one byte tag is followed by the value. Ints use the smallest of 1, 4 or
+# 8 bytes; floats are single precision. str and bytes have a 16 bit length, list,
+# tuple and dict a 16 bit element count. Tuples decode as lists.
+class Packed:
+    @staticmethod
+    def encode(buf, i, obj):
+        if obj is None:
+            n = _room(buf, i, 1)
+            buf[i] = 0x4E  # N
+        elif obj is False or obj is True:
+            n = _room(buf, i, 1)
+            buf[i] = 0x54 if obj else 0x46  # T F
+        elif isinstance(obj, int):
+            if -128 <= obj <= 127:
+                n = _room(buf, i, 2)
+                struct.pack_into("<Bb", buf, i, 0x62, obj)  # b
+            elif -0x80000000 <= obj <= 0x7FFFFFFF:
+                n = _room(buf, i, 5)
+                struct.pack_into("<Bi", buf, i, 0x69, obj)  # i
+            else:
+                n = _room(buf, i, 9)
+                struct.pack_into("<Bq", buf, i, 0x71, obj)  # q
+        elif isinstance(obj, float):
+            n = _room(buf, i, 5)
+            struct.pack_into("<Bf", buf, i, 0x66, obj)  # f
+        elif isinstance(obj, (str, bytes, bytearray, memoryview)):
+            tag = 0x73  # s
+            if isinstance(obj, str):
+                obj = obj.encode()
+            else:
+                tag = 0x79  # y
+            n = _room(buf, i, 3)
+            struct.pack_into("<BH", buf, i, tag, len(obj))
+            n = Raw.encode(buf, n, obj)
+        elif isinstance(obj, (list, tuple)):
+            n = _room(buf, i, 3)
+            struct.pack_into("<BH", buf, i, 0x6C, len(obj))  # l
+            for v in obj:
+                n = Packed.encode(buf, n, v)
+        elif isinstance(obj, dict):
+            n = _room(buf, i, 3)
+            struct.pack_into("<BH", buf, i, 0x64, len(obj))  # d
+            for k in obj:
+                n = Packed.encode(buf, n, k)
+                n = Packed.encode(buf, n, obj[k])
+        else:
+            raise TypeError("Cannot pack", type(obj))
+        return n
+
+    @staticmethod
+    def decode(mv):
+        obj, n = Packed._decode(mv, 0)
+        if n != len(mv):
+            raise ValueError("Trailing data in frame")
+        return obj
+
+    @staticmethod
+    def _decode(mv, i):  # Return (object, index of next byte)
+        tag = mv[i]
+        i += 1
+        if tag == 0x4E:
+            return None, i
+        if tag == 0x54:
+            return True, i
+        if tag == 0x46:
+            return False, i
+        if tag == 0x62:
+            return struct.unpack_from("<b", mv, i)[0], i + 1
+        if tag == 0x69:
+            return struct.unpack_from("<i", mv, i)[0], i + 4
+        if tag == 0x71:
+            return struct.unpack_from("<q", mv, i)[0], i + 8
+        if tag == 0x66:
+            return struct.unpack_from("<f", mv, i)[0], i + 4
+        n = mv[i] | (mv[i + 1] << 8)  # Length or element count
+        i += 2
+        if tag == 0x73:
+            return str(mv[i : i + n], "utf8"), i + n
+        if tag == 0x79:
+            return bytes(mv[i : i + n]), i + n
+        if tag == 0x6C:
+            obj = []
+            for _ in range(n):
+                v, i = Packed._decode(mv, i)
+                obj.append(v)
+            return obj, i
+        if tag == 0x64:
+            obj = {}
+            for _ in range(n):
+                k, i = Packed._decode(mv, i)
+                obj[k], i = Packed._decode(mv, i)
+            return obj, i
+        raise ValueError("Bad tag", tag)
+
+
+# Framing modes. frame() encodes obj at buf[i:] and returns the end index.
+# parse() examines the received data buf[ri:wi] returning None if no complete frame
+# is present, otherwise (payload start, payload end, start of next frame). Data
+# before buf[si] is known to hold no frame boundary. Modes hold no state so an
+# instance may be shared by several streams.
+
+
+class LenPrefix:  # Frame is an unsigned big-endian length followed by payload
+    def __init__(self, nbytes=2):
+        if nbytes not in (1, 2, 4):
+            raise ValueError("Length prefix must be 1, 2 or 4 bytes")
+        self._nb = nbytes
+        self._max = (1 << (8 * nbytes)) - 1
+
+    def frame(self, buf, i, ser, obj):
+        start = _room(buf, i, self._nb)
+        n = ser.encode(buf, start, obj)
+        if (ln := n - start) > self._max:
+            raise ValueError("Frame too long")
+        nb = self._nb
+        while nb:  # Write length header
+            nb -= 1
+            buf[i + nb] = ln & 0xFF
+            ln >>= 8
+        return n
+
+    def parse(self, buf, ri, si, wi):
+        start = ri + self._nb
+        if start > wi:
+            return None
+        ln = 0
+        while ri < start:
+            ln = (ln << 8) | buf[ri]
+            ri += 1
+        end = start + ln
+        return None if end > wi else (start, end, end)
+
+
+class Delimited:  # Payload is terminated by a single byte delimiter (default b"\n")
+    def __init__(self, delim=b"\n"):
+        self._d = delim[0] if isinstance(delim, (bytes, bytearray)) else delim
+
+    def frame(self, buf, i, ser, obj):
+        n = _room(buf, ser.encode(buf, i, obj), 1)
+        buf[n - 1] = self._d
+        return n
+
+    def parse(self, buf, ri, si, wi):  # Data already checked is not rescanned
+        d = self._d
+        while si < wi:
+            if buf[si] == d:
+                return (ri, si, si + 1)
+            si += 1
+        return None
+
+
+class FrameStream:
+    # stream: an object supported by StreamReader e.g. UART or socket, or a Stream.
+    # mode: LenPrefix or Delimited instance. ser: serialiser class.
+    # rxbuf, txbuf: buffer sizes or pre-allocated bytearrays. rxbuf must be large
+    # enough to hold the longest incoming frame.
+    def __init__(self, stream, mode=None, ser=Raw, rxbuf=512, txbuf=512):
+        self._stream = stream if isinstance(stream, asyncio.StreamReader) else asyncio.StreamReader(stream)
+        self._mode = LenPrefix() if mode is None else mode
+        self._ser = ser
+        self._rxb = bytearray(rxbuf) if isinstance(rxbuf, int) else rxbuf
+        self._rxm = memoryview(self._rxb)
+        self._ri = 0  # Start of unprocessed rx data
+        self._si = 0  # End of rx data examined by the mode
+        self._wi = 0  # End of rx data
+        self._txb = bytearray(txbuf) if isinstance(txbuf, int) else txbuf
+        self._txm = memoryview(self._txb)
+        self._ti = 0  # End of pending tx frames
+
+    # Receive
+
+    def _frame(self):  # Return the next complete payload or None
+        if (f := self._mode.parse(self._rxb, self._ri, self._si, self._wi)) is None:
+            self._si = self._wi
+            return None
+        self._ri = self._si = f[2]
+        return self._rxm[f[0] : f[1]]
+
+    async def _fill(self):
+        ri = self._ri
+        wi = self._wi
+        if ri == wi:  # All data consumed
+            self._ri = self._si = self._wi = ri = wi = 0
+        elif wi == len(self._rxb):  # Out of space: move partial frame down
+            if ri == 0:
+                raise ValueError("Frame exceeds receive buffer")
+            self._rxm[: wi - ri] = self._rxm[ri:wi]
+            self._si -= ri
+            self._ri = 0
+            self._wi = wi = wi - ri
+        n = await self._stream.readinto(self._rxm[wi:])
+        if n is not None:  # None: nothing available despite poll
+            if not n:
+                raise EOFError
+            self._wi += n
+
+    # Return the next message. Raises EOFError if the remote closes the stream.
+    # With the Raw serialiser the payload is valid until the next call.
+    async def recv(self):
+        while (mv := self._frame()) is None:
+            await self._fill()
+        return self._ser.decode(mv)
+
+    # Return a message if one is already buffered, otherwise None. Enables a
+    # consumer to process a burst of messages after a single await recv().
+    def recv_nowait(self):
+        return None if (mv := self._frame()) is None else self._ser.decode(mv)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.recv()
+
+    # Transmit
+
+    # Encode a message into the transmit buffer. Nothing is sent until drain().
+    # Raises IndexError if there is insufficient space.
+    def put(self, obj):  # A partially encoded frame is discarded
+        self._ti = self._mode.frame(self._txb, self._ti, self._ser, obj)
+
+    def pending(self):  # Number of bytes awaiting drain()
+        return self._ti
+
+    async def drain(self):  # Send all pending frames with a single write.
+        if self._ti:
+            self._stream.write(self._txm[: self._ti])
+            self._ti = 0
+        await self._stream.drain()
+
+    # Send one or more messages, draining as often as necessary to fit the buffer.
+    async def send(self, *objs):
+        for obj in objs:
+            try:
+                self.put(obj)
+            except IndexError:
+                if not self._ti:  # Buffer is empty: message can never fit
+                    raise ValueError("Frame exceeds transmit buffer")
+                await self.drain()
+                self.put(obj)
+        await self.drain()
+
+    def close(self):
+        self._stream.close()
+
+    async def wait_closed(self):
+        await self._stream.wait_closed()
@@ -0,0 +1,115 @@
+# framing_bench.py Messages per second: readline + json versus FrameStream
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Runs on any target including the Unix build. Usage:
+# import as_drivers.framing.framing_bench
+
+import asyncio
+import io
+import json
+from time import ticks_ms, ticks_diff
+from .framing import FrameStream, LenPrefix, Delimited, Json, Packed
+
+MSG = ["value", 1, {"temp": 21, "ok": True}]
+NMSGS = 2000
+BATCH = 20  # Messages encoded per drain()
+
+
+# In-memory stream: data written is available for reading.
+class Loopback(io.IOBase):
+    def __init__(self, size=4096):
+        self._buf = bytearray(size)
+        self._mv = memoryview(self._buf)
+        self._ri = 0
+        self._wi = 0
+
+    def ioctl(self, req, arg):
+        if req == 3:  # MP_STREAM_POLL
+            ret = 0
+            if arg & 1 and self._wi > self._ri:  # POLLIN
+                ret |= 1
+            if arg & 4 and self._wi < len(self._buf):  # POLLOUT
+                ret |= 4
+            return ret
+        return 0
+
+    def _compact(self):
+        if self._ri == self._wi:
+            self._ri = self._wi = 0
+
+    def write(self, buf):
+        n = min(len(buf), len(self._buf) - self._wi)
+        self._mv[self._wi : self._wi + n] = buf[:n]
+        self._wi += n
+        return n
+
+    def readinto(self, buf):
+        n = min(len(buf), self._wi - self._ri)
+        buf[:n] = self._mv[self._ri : self._ri + n]
+        self._ri += n
+        self._compact()
+        return n
+
+    def readline(self):
+        ri = self._ri
+        while ri < self._wi:
+            ri += 1
+            if self._buf[ri - 1] == 10:
+                break
+        l = bytes(self._mv[self._ri : ri])
+        self._ri = ri
+        self._compact()
+        return l
+
+
+async def json_lines(lb):  # The approach used in client_server/userver.py
+    sr = asyncio.StreamReader(lb)
+    sw = asyncio.StreamWriter(lb, {})
+
+    async def sender():
+        for n in range(NMSGS):
+            sw.write("{}\n".format(json.dumps(MSG)))
+            if n % BATCH == BATCH - 1:
+                await sw.drain()
+
+    asyncio.create_task(sender())
+    for _ in range(NMSGS):
+        json.loads(await sr.readline())
+
+
+async def framed(lb, mode, ser):
+    fs = FrameStream(lb, mode, ser, txbuf=1024)
+
+    async def sender():
+        for n in range(NMSGS):
+            fs.put(MSG)
+            if n % BATCH == BATCH - 1:
+                await fs.drain()
+
+    asyncio.create_task(sender())
+    for _ in range(NMSGS):
+        await fs.recv()
+
+
+async def run(name, coro):
+    t = ticks_ms()
+    await coro
+    dt = max(ticks_diff(ticks_ms(), t), 1)
+    print("{:24s} {:6d} msgs/s".format(name, NMSGS * 1000 // dt))
+    await asyncio.sleep_ms(0)
+
+
+async def main():
+    print("Sending {} messages in batches of {}.".format(NMSGS, BATCH))
+    await run("readline + json", json_lines(Loopback()))
+    await run("Delimited + Json", framed(Loopback(), Delimited(), Json))
+    await run("LenPrefix + Json", framed(Loopback(), LenPrefix(), Json))
+    await run("LenPrefix + Packed", framed(Loopback(), LenPrefix(), Packed))
+
+
+try:
+    asyncio.run(main())
+finally:
+    asyncio.new_event_loop()
@@ -0,0 +1,46 @@
+# Freeze the device drivers into firmware. Tests and demos are omitted. Add to
+# a board manifest with:
+# include("<path to micropython-async>/v3/as_drivers/manifest.py")
+# Drivers depend on primitives and threadsafe: include their manifests too.
+# Unused drivers cost only flash, but entries may be deleted to save it.
+package(
+    "as_drivers",
+    (
+        "as_GPS/__init__.py",
+        "as_GPS/as_GPS.py",
+        "as_GPS/as_GPS_utils.py",
+        "as_GPS/as_rwGPS.py",
+        "as_GPS/as_tGPS.py",
+        "bridge/__init__.py",
+        "bridge/bridge.py",
+        "framing/__init__.py",
+        "framing/framing.py",
+        "hd44780/__init__.py",
+        "hd44780/alcd.py",
+        "htu21d/__init__.py",
+        "htu21d/htu21d_mc.py",
+        "i2c/__init__.py",
+        "i2c/asi2c.py",
+        "i2c/asi2c_i.py",
+        "metrics/__init__.py",
+        "metrics/metrics.py",
+        "nec_ir/__init__.py",
+        "nec_ir/aremote.py",
+        "rpc/__init__.py",
+        "rpc/rpc.py",
+    ),
+    base_path="..",
+    opt=3,
+)
+
+# The scheduler is installed as a top level package
+package(
+    "sched",
+    (
+        "__init__.py",
+        "cron.py",
+        "sched.py",
+        "primitives/__init__.py",
+    ),
+    opt=3,
+)
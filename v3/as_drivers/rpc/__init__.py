@@ -0,0 +1 @@
+from .rpc import *
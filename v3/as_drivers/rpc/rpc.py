@@ -0,0 +1,270 @@
+# rpc.py Asynchronous request/response server and client
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Built on asyncio.start_server and as_drivers.framing. A request is a list
+# [id, method, params], a response [id, error, result]. A request with an id of
+# None is a notification and receives no response.
+# Requests are pipelined: a client may send any number without waiting for the
+# responses, which are returned in order of completion. Responses are encoded
+# into a per-connection transmit buffer and those completing together are sent
+# with a single write.
+
+import asyncio
+from time import ticks_ms, ticks_diff
+from primitives import Semaphore, type_coro
+from as_drivers.framing import FrameStream, LenPrefix, Json
+
+__all__ = ("RpcError", "RpcServer", "RpcClient")
+
+
+class RpcError(Exception):
+    pass
+
+
+# A framed link with a single writer task. Any number of tasks may queue messages:
+# those queued while a write is in progress are sent together by the next.
+# Once the link is closed or the writer has failed, send raises OSError.
+class _Link:
+    def __init__(self, stream, mode, ser, bufsize):
+        self.fs = FrameStream(stream, mode, ser, bufsize, bufsize)
+        self._txev = asyncio.Event()  # Data awaits transmission
+        self._flushed = asyncio.Event()  # Transmit buffer has been emptied
+        self._closed = False
+        self._wtask = asyncio.create_task(self._writer())
+
+    async def _writer(self):
+        fs = self.fs
+        try:
+            while True:
+                await self._txev.wait()
+                self._txev.clear()
+                await fs.drain()
+                self._flushed.set()
+                self._flushed.clear()
+        except OSError:  # Peer has gone: the reader will see EOF
+            pass
+        finally:  # Wake any sender waiting for space
+            self._closed = True
+            self._flushed.set()
+
+    async def send(self, msg):
+        while True:
+            if self._closed:
+                raise OSError("Link closed")
+            try:
+                self.fs.put(msg)
+                break
+            except IndexError:
+                if not self.fs.pending():
+                    raise ValueError("Message exceeds buffer")
+                self._txev.set()
+                await self._flushed.wait()
+        self._txev.set()
+
+    async def close(self):
+        self._closed = True
+        self._wtask.cancel()
+        await self.fs.wait_closed()
+
+
+class _Conn(_Link):
+    def __init__(self, stream, mode, ser, bufsize, maxconc):
+        super().__init__(stream, mode, ser, bufsize)
+        self.sem = Semaphore(maxconc)  # Per-connection concurrency cap
+        self.last = ticks_ms()  # Time of last activity
+        self.busy = 0  # Requests in progress
+        self.task = None  # Reader task
+        self.handlers = set()  # Tasks running coroutine handlers
+
+    def cancel(self):
+        self.task.cancel()
+        for t in self.handlers:
+            t.cancel()
+
+
+class RpcServer:
+    # mode: a framing mode class, default LenPrefix. ser: a framing serialiser.
+    # bufsize: size of each connection's receive and transmit buffers. maxconc: per-connection cap on
+    # concurrently running coroutine handlers; maxglobal: cap across all
+    # connections. idle_ms: connections idle for longer are closed by a single
+    # sweep task running every sweep_ms (0 disables).
+    def __init__(
+        self, handlers=None, mode=None, ser=Json, bufsize=512, maxconc=4, maxglobal=32, idle_ms=20_000, sweep_ms=1000
+    ):
+        self._handlers = {} if handlers is None else handlers
+        self._mode = LenPrefix if mode is None else mode
+        self._ser = ser
+        self._bufsize = bufsize
+        self._maxconc = maxconc
+        self._gsem = Semaphore(maxglobal)
+        self._idle = idle_ms
+        self._sweep_ms = sweep_ms
+        self._conns = set()
+        self._running = 0  # Coroutine handlers in progress
+        self._server = None
+        self._stask = None
+
+    # A handler is a function or coroutine taking the request params as args. Its
+    # return value is the result. An exception is returned to the client as error.
+    def register(self, method, handler):
+        self._handlers[method] = handler
+
+    async def start(self, host="0.0.0.0", port=8123, backlog=5):
+        self._server = await asyncio.start_server(self._run_conn, host, port, backlog)
+        if self._idle and self._sweep_ms:
+            self._stask = asyncio.create_task(self._sweep())
+
+    def connections(self):
+        return len(self._conns)
+
+    def running(self):  # Number of coroutine handlers holding permits
+        return self._running
+
+    async def close(self):
+        if self._stask is not None:
+            self._stask.cancel()
+        for c in self._conns:
+            c.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _sweep(self):  # Close idle connections
+        while True:
+            await asyncio.sleep_ms(self._sweep_ms)
+            t = ticks_ms()
+            for c in self._conns:
+                if not c.busy and ticks_diff(t, c.last) > self._idle:
+                    c.task.cancel()
+
+    async def _run_conn(self, sreader, swriter):
+        c = _Conn(sreader, self._mode(), self._ser, self._bufsize, self._maxconc)
+        c.task = asyncio.current_task()
+        self._conns.add(c)
+        try:
+            while True:
+                req = await c.fs.recv()
+                c.last = ticks_ms()
+                await self._dispatch(c, req)
+        except (OSError, EOFError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            self._conns.discard(c)
+            # No one to reply to. A task cancelled before it has run never runs
+            # its finally clause, so its permits are released here.
+            for t in tuple(c.handlers):
+                t.cancel()
+                self._release(c, t)
+            await c.close()
+
+    async def _dispatch(self, c, req):
+        try:
+            rid, method, params = req
+        except (TypeError, ValueError):
+            return  # Malformed request has no usable id
+        if (func := self._handlers.get(method, None)) is None:
+            await self._reply(c, rid, "Unknown method")
+            return
+        try:
+            res = func(*params)
+        except Exception as e:
+            await self._reply(c, rid, repr(e))
+            return
+        if isinstance(res, type_coro):
+            # Reading pauses while either concurrency cap is reached
+            await c.sem.acquire()
+            await self._gsem.acquire()
+            c.busy += 1
+            self._running += 1
+            c.handlers.add(asyncio.create_task(self._run(c, rid, res)))
+        else:
+            await self._reply(c, rid, None, res)
+
+    async def _run(self, c, rid, coro):
+        try:
+            try:
+                res = await coro
+            except Exception as e:
+                await self._reply(c, rid, repr(e))
+            else:
+                await self._reply(c, rid, None, res)
+        except OSError:  # Connection has closed
+            pass
+        finally:
+            self._release(c, asyncio.current_task())
+            c.last = ticks_ms()
+
+    def _release(self, c, t):  # Release the permits held by handler task t once only
+        if t in c.handlers:
+            c.handlers.discard(t)
+            c.busy -= 1
+            self._running -= 1
+            self._gsem.release()
+            c.sem.release()
+
+    async def _reply(self, c, rid, err, res=None):
+        if rid is not None:
+            await c.send([rid, err, res])
+
+
+class RpcClient:
+    # Multiplexes concurrent requests over one connection. mode must be a framing
+    # mode class (default LenPrefix) and ser a serialiser matching the server.
+    def __init__(self, mode=None, ser=Json, bufsize=512):
+        self._mode = LenPrefix if mode is None else mode
+        self._ser = ser
+        self._bufsize = bufsize
+        self._link = None
+        self._rtask = None
+        self._pending = {}  # id: [Event, error, result]
+        self._id = 0
+
+    async def connect(self, host, port):
+        sr, _ = await asyncio.open_connection(host, port)
+        self._link = _Link(sr, self._mode(), self._ser, self._bufsize)
+        self._rtask = asyncio.create_task(self._reader())
+
+    async def _reader(self):
+        try:
+            async for rid, err, res in self._link.fs:
+                if (p := self._pending.pop(rid, None)) is not None:
+                    p[1] = err
+                    p[2] = res
+                    p[0].set()
+        except (OSError, EOFError, ValueError):
+            pass
+        finally:  # Fail outstanding calls, including on close() or a bad response
+            for p in self._pending.values():
+                p[1] = "Connection lost"
+                p[0].set()
+            self._pending.clear()
+
+    # Call a remote method returning its result. Raises RpcError if the method
+    # failed and asyncio.TimeoutError if timeout_ms elapsed.
+    async def call(self, method, *params, timeout_ms=None):
+        self._id = (self._id + 1) & 0x3FFFFFFF
+        rid = self._id
+        p = [asyncio.Event(), None, None]
+        self._pending[rid] = p
+        try:
+            await self._link.send([rid, method, params])
+            if timeout_ms is None:
+                await p[0].wait()
+            else:
+                await asyncio.wait_for_ms(p[0].wait(), timeout_ms)
+        finally:
+            self._pending.pop(rid, None)
+        if p[1] is not None:
+            raise RpcError(p[1])
+        return p[2]
+
+    async def notify(self, method, *params):  # No response is expected
+        await self._link.send([None, method, params])
+
+    async def close(self):
+        if self._rtask is not None:
+            self._rtask.cancel()
+            await self._link.close()
+            self._rtask = None
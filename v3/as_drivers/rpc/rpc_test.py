@@ -0,0 +1,70 @@
+# rpc_test.py Demo/test of RpcServer and RpcClient on one host
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Runs on the Unix build or on any networked target. Usage:
+# import as_drivers.rpc.rpc_test
+
+import asyncio
+from .rpc import RpcServer, RpcClient, RpcError
+
+PORT = 8124
+
+
+def add(a, b):  # Synchronous handler
+    return a + b
+
+
+async def slow_echo(x, ms):  # Asynchronous handler
+    await asyncio.sleep_ms(ms)
+    return x
+
+
+async def main():
+    server = RpcServer({"add": add, "echo": slow_echo}, maxconc=8, idle_ms=2000, sweep_ms=500)
+    await server.start("127.0.0.1", PORT)
+    client = RpcClient()
+    await client.connect("127.0.0.1", PORT)
+    print("add", await client.call("add", 2, 3))
+    # Pipelined requests: responses arrive in order of completion
+    res = await asyncio.gather(*(client.call("echo", n, 100 - 10 * n) for n in range(10)))
+    print("gather", res)
+    try:
+        await client.call("nonexistent")
+    except RpcError as e:
+        print("RpcError", e)
+    try:
+        await client.call("echo", 1, 1000, timeout_ms=100)
+    except asyncio.TimeoutError:
+        print("Timeout OK")
+    print("Connections", server.connections())
+    await asyncio.sleep(4)  # Idle sweep closes the connection
+    print("Connections after idle period", server.connections())
+    await client.close()
+    # Closing the client fails its calls in progress
+    client = RpcClient()
+    await client.connect("127.0.0.1", PORT)
+    call = asyncio.create_task(client.call("echo", 0, 10_000))
+    await asyncio.sleep_ms(200)
+    await client.close()
+    try:
+        await call
+    except RpcError:
+        print("Call failed on client close")
+    # Closing the server cancels handlers in progress, releasing their permits
+    client = RpcClient()
+    await client.connect("127.0.0.1", PORT)
+    calls = [asyncio.create_task(client.call("echo", n, 10_000)) for n in range(4)]
+    await asyncio.sleep_ms(200)
+    await server.close()
+    res = await asyncio.gather(*calls, return_exceptions=True)
+    print("Calls failed on close", all(isinstance(r, RpcError) for r in res))
+    print("Permits released", server.running() == 0)
+    await client.close()
+
+
+try:
+    asyncio.run(main())
+finally:
+    asyncio.new_event_loop()
@@ -5,6 +5,7 @@
 # 1. IO tasks can be prioritised by scheduling to run at a time in the past.
 # 2. Where machine.deepsleep is available and lowpower is True uses deepsleep to
 # minimise power consumption.
+# 3. Stream reads may have a deadline, expired by the poller without a timer task.
 
 lowpower = False  # Global low power flag
 late = 0  # Default roundrobin scheduling
@@ -100,29 +101,45 @@ def sleep(t):
 class IOQueue:
     def __init__(self):
         self.poller = select.poll()
-        self.map = {}  # maps id(stream) to [task_waiting_read, task_waiting_write, stream]
+        # maps id(stream) to [task_waiting_read, task_waiting_write, stream, read_deadline]
+        self.map = {}
+        self.ntimed = 0  # Number of entries with a read deadline
+        self.tnext = None  # No read deadline is earlier than this
 
-    def _enqueue(self, s, idx):
+    def _enqueue(self, s, idx, tend=None):
         if id(s) not in self.map:
-            entry = [None, None, s]
+            entry = [None, None, s, None]
             entry[idx] = cur_task
             self.map[id(s)] = entry
             self.poller.register(s, select.POLLIN if idx == 0 else select.POLLOUT)
         else:
-            sm = self.map[id(s)]
-            assert sm[idx] is None
-            assert sm[1 - idx] is not None
-            sm[idx] = cur_task
+            entry = self.map[id(s)]
+            assert entry[idx] is None
+            assert entry[1 - idx] is not None
+            entry[idx] = cur_task
             self.poller.modify(s, select.POLLIN | select.POLLOUT)
+        if tend is not None:
+            entry[3] = tend
+            self.ntimed += 1
+            if self.tnext is None or ticks_diff(tend, self.tnext) < 0:
+                self.tnext = tend
         # Link task to this IOQueue so it can be removed if needed
         cur_task.data = self
 
+    def _untime(self):  # An entry's read deadline has been cleared
+        self.ntimed -= 1
+        if not self.ntimed:
+            self.tnext = None
+
     def _dequeue(self, s):
-        del self.map[id(s)]
+        if self.map.pop(id(s))[3] is not None:
+            self._untime()
         self.poller.unregister(s)
 
-    def queue_read(self, s):
-        self._enqueue(s, 0)
+    # Optional timeout (ms) raises TimeoutError in the waiting task if the stream
+    # does not become readable in time. No timer task is involved.
+    def queue_read(self, s, timeout_ms=None):
+        self._enqueue(s, 0, None if timeout_ms is None else ticks_add(ticks(), max(0, timeout_ms)))
 
     def queue_write(self, s):
         self._enqueue(s, 1)
@@ -131,7 +148,7 @@ class IOQueue:
         while True:
             del_s = None
             for k in self.map:  # Iterate without allocating on the heap
-                q0, q1, s = self.map[k]
+                q0, q1, s, _ = self.map[k]
                 if q0 is task or q1 is task:
                     del_s = s
                     break
@@ -140,8 +157,51 @@ class IOQueue:
             else:
                 break
 
-    def wait_io_event(self, dt):
+    # Reduce poll timeout dt so that the poller returns by the earliest read deadline.
+    def _timeout(self, dt):
+        td = max(0, ticks_diff(self.tnext, ticks()))
+        return td if dt < 0 or td < dt else dt
+
+    # Schedule tasks whose read deadline has passed, throwing TimeoutError into them.
+    # The map is scanned only when the earliest deadline is due. One pass expires
+    # all due entries and finds the next deadline.
+    def _expire(self):
+        now = ticks()
+        if ticks_diff(self.tnext, now) > 0:
+            return False
+        tnext = None
+        expired = False
+        done = None  # Streams with no remaining waiter
+        for k in self.map:  # Iterate without allocating on the heap
+            sm = self.map[k]
+            if (tend := sm[3]) is None:
+                continue
+            if ticks_diff(tend, now) > 0:
+                if tnext is None or ticks_diff(tend, tnext) < 0:
+                    tnext = tend
+                continue
+            t = sm[0]
+            sm[0] = None
+            sm[3] = None
+            self.ntimed -= 1
+            _task_queue.push(t, ticks_add(now, late))
+            t.data = TimeoutError  # Thrown into the task when it is resumed
+            expired = True
+            if sm[1] is None:
+                if done is None:
+                    done = []
+                done.append(sm[2])  # Can't change the map while iterating
+            else:
+                self.poller.modify(sm[2], select.POLLOUT)
+        self.tnext = tnext
+        if done is not None:
+            for s in done:
+                self._dequeue(s)
+        return expired
 
+    def wait_io_event(self, dt):
+        if self.ntimed:
+            dt = self._timeout(dt)
         pt = 0 if lowpower else dt  # Poll timeout
         pending = False
         while dt >= 0:
@@ -153,6 +213,9 @@ class IOQueue:
                     _task_queue.push(sm[0], ticks_add(ticks(), late))  # Overdue task
                     pending = True
                     sm[0] = None
+                    if sm[3] is not None:  # Read completed before its deadline
+                        sm[3] = None
+                        self._untime()
                 if ev & ~select.POLLIN and sm[1] is not None:
                     # POLLOUT or error
                     _task_queue.push(sm[1], ticks_add(ticks(), late))  # Overdue task
@@ -164,6 +227,8 @@ class IOQueue:
                     self.poller.modify(s, select.POLLOUT)
                 else:
                     self.poller.modify(s, select.POLLIN)
+            if self.ntimed and self._expire():
+                pending = True
             if lowpower and not pending:  # brief sleep
                 if (tw := min(dt, 20)) > 0:
                     machine.lightsleep(tw)
@@ -0,0 +1,47 @@
+# tsf_fds.py Check that discarded ThreadSafeFlag instances release resources
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2026 Peter Hinch
+
+# On the Unix port a flag uses file descriptors while a task waits on it.
+# Many flags are created, waited on, set and discarded: some waits are
+# cancelled. The number of open file descriptors should not grow. On other
+# ports the test checks only that the flags work.
+
+import asyncio_alt as asyncio
+import os
+
+NFLAGS = 5000
+
+
+def nfds():  # Open file descriptors of this process, or None if unknown
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except (OSError, AttributeError):
+        return None
+
+
+async def main():
+    before = nfds()
+    woken = 0
+    for n in range(NFLAGS):
+        tsf = asyncio.ThreadSafeFlag()
+        task = asyncio.create_task(tsf.wait())
+        await asyncio.sleep_ms(0)  # Task is waiting
+        if n % 10:
+            tsf.set()
+            await task
+            woken += 1
+        else:
+            task.cancel()
+            await asyncio.sleep_ms(0)
+    after = nfds()
+    print(f"{NFLAGS} flags: {woken} woken, {NFLAGS - woken} waits cancelled")
+    if before is None:
+        print("File descriptors: unknown on this platform")
+    else:
+        print(f"File descriptors: {before} before, {after} after")
+        print("Pass" if after - before <= 2 else "Fail: descriptors leaked")
+
+
+asyncio.run(main())
@@ -0,0 +1,39 @@
+# tsf_idle.py Measure scheduler overhead of idle ThreadSafeFlag instances
+
+# Released under the MIT License (MIT). See LICENSE.
+# Copyright (c) 2026 Peter Hinch
+
+# A task counts the scheduler passes it achieves in one second while N tasks wait
+# on ThreadSafeFlags which are never set. Where a flag is polled by ioctl, each
+# idle flag adds a Python method call to every pass. On the Unix port flags are
+# backed by file descriptors and the overhead should be negligible.
+
+import asyncio_alt as asyncio
+from time import ticks_ms, ticks_diff
+
+
+async def idle(tsf):
+    await tsf.wait()
+
+
+async def passes():  # Count scheduler passes in 1s
+    n = 0
+    t = ticks_ms()
+    while ticks_diff(ticks_ms(), t) < 1000:
+        await asyncio.sleep_ms(0)
+        n += 1
+    return n
+
+
+async def main():
+    for nflags in (0, 10, 100):
+        flags = [asyncio.ThreadSafeFlag() for _ in range(nflags)]
+        tasks = [asyncio.create_task(idle(f)) for f in flags]
+        await asyncio.sleep_ms(0)
+        print(f"{nflags:3d} idle flags: {await passes():8d} passes/s")
+        for t in tasks:
+            t.cancel()
+        await asyncio.sleep_ms(0)
+
+
+asyncio.run(main())
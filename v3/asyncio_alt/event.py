@@ -64,3 +64,81 @@ try:
 
 except ImportError:
     pass
+
+
+# On the Unix port a waiting flag is backed by an eventfd (or failing that a
+# pipe). The poller waits on the file descriptor in C, so an idle flag costs
+# nothing on each pass of the scheduler; a thread setting the flag wakes the
+# poller at once. .state remains the flag: the descriptor is only a wakeup,
+# drained by wait(). A flag holds descriptors only while a task waits on it.
+# They are then returned to a pool, so descriptors in use never exceed the
+# number of tasks waiting at once and a discarded flag holds none. A set() from
+# another thread racing with the return of descriptors can at worst cause a
+# spurious wakeup of a later user, which finds .state clear and waits again.
+try:
+    import sys
+
+    if sys.platform != "linux":
+        raise ImportError
+    import ffi
+    from array import array
+
+    try:
+        _libc = ffi.open("libc.so.6")
+    except OSError:
+        _libc = ffi.open("libc.so")
+    _write = _libc.func("i", "write", "iPi")
+    _read = _libc.func("i", "read", "ipi")
+    _one = array("Q", (1,))  # eventfd counter increment. Also works for a pipe.
+    _rbuf = bytearray(64)
+    _pool = []  # (read, write) descriptors not in use
+
+    def _fds():  # Return nonblocking (read, write) file descriptors
+        if _pool:
+            return _pool.pop()
+        try:
+            fd = _libc.func("i", "eventfd", "Ii")(0, 0o4000 | 0o2000000)  # EFD_NONBLOCK | EFD_CLOEXEC
+            if fd >= 0:
+                return fd, fd
+        except OSError:  # Symbol not found
+            pass
+        fds = array("i", (-1, -1))
+        if _libc.func("i", "pipe2", "pi")(fds, 0o4000 | 0o2000000) < 0:  # O_NONBLOCK | O_CLOEXEC
+            raise OSError("Cannot create file descriptor")
+        return fds[0], fds[1]
+
+    class ThreadSafeFlag(io.IOBase):
+        def __init__(self):
+            self.state = 0
+            self._fds = None  # Descriptors while a task is waiting
+
+        def ioctl(self, req, flags):
+            if req == 10:  # MP_STREAM_GET_FILENO: poll() waits on the descriptor
+                return self._fds[0]
+            if req == 3:  # MP_STREAM_POLL
+                return self.state * flags
+            return -1  # Other requests are unsupported
+
+        def set(self):
+            if not self.state:
+                self.state = 1
+                if (fds := self._fds) is not None:
+                    _write(fds[1], _one, 8)
+
+        def clear(self):
+            self.state = 0
+
+        async def wait(self):
+            if not self.state:
+                self._fds = fds = _fds()
+                try:
+                    while not self.state:  # A wakeup may be stale: only .state counts
+                        yield core._io_queue.queue_read(self)
+                        _read(fds[0], _rbuf, len(_rbuf))  # Reset the descriptor
+                finally:  # Poller has unregistered the flag, even if cancelled
+                    self._fds = None
+                    _pool.append(fds)
+            self.state = 0
+
+except (ImportError, OSError):  # Not Unix, or no ffi or libc
+    pass
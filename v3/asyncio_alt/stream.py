@@ -20,11 +20,13 @@ class Stream:
         # TODO yield?
         self.s.close()
 
+    # Where timeout_ms is specified, read, readinto and readline raise TimeoutError
+    # if no data arrives for that period. Each wait restarts the timeout.
     # async
-    def read(self, n=-1):
+    def read(self, n=-1, timeout_ms=None):
         r = b""
         while True:
-            yield core._io_queue.queue_read(self.s)
+            yield core._io_queue.queue_read(self.s, timeout_ms)
             r2 = self.s.read(n)
             if r2 is not None:
                 if n >= 0:
@@ -34,8 +36,8 @@ class Stream:
                 r += r2
 
     # async
-    def readinto(self, buf):
-        yield core._io_queue.queue_read(self.s)
+    def readinto(self, buf, timeout_ms=None):
+        yield core._io_queue.queue_read(self.s, timeout_ms)
         return self.s.readinto(buf)
 
     # async
@@ -52,10 +54,10 @@ class Stream:
         return r
 
     # async
-    def readline(self):
+    def readline(self, timeout_ms=None):
         l = b""
         while True:
-            yield core._io_queue.queue_read(self.s)
+            yield core._io_queue.queue_read(self.s, timeout_ms)
             l2 = self.s.readline()  # may do multiple reads but won't block
             if l2 is None:
                 continue
@@ -1,6 +1,6 @@
 # __init__.py Common functions for asyncio primitives
 
-# Copyright (c) 2018-2024 Peter Hinch
+# Copyright (c) 2018-2026 Peter Hinch
 # Released under the MIT License (MIT) - see LICENSE file
 
 import asyncio
@@ -22,6 +22,23 @@ def launch(func, tup_args):
     return res
 
 
+# Used by switch and button classes in IRQ mode. Pause until the pin changes
+# state, then run check(read()) every dt ms until it returns False indicating
+# that the state is stable. Idle inputs incur no wakeups.
+async def _irq_poll(pin, read, check, dt):
+    tsf = asyncio.ThreadSafeFlag()
+    pin.irq(lambda _: tsf.set(), trigger=pin.IRQ_RISING | pin.IRQ_FALLING)
+    try:
+        while True:
+            # Read before idling: the pin may have changed before the IRQ was armed
+            while check(read()):  # State changed: wait out bounce
+                await asyncio.sleep_ms(dt)
+                tsf.clear()  # Prior edges are covered by the next read
+            await tsf.wait()  # Idle until an edge
+    finally:
+        pin.irq(None)
+
+
 def set_global_exception():
     def _handle_exception(loop, context):
         import sys
@@ -35,14 +52,19 @@ def set_global_exception():
 
 _attrs = {
     "AADC": "aadc",
+    "BlockADC": "aadc",
     "Barrier": "barrier",
     "Condition": "condition",
     "Delay_ms": "delay_ms",
     "Encoder": "encoder",
+    "EncoderBank": "encoder",
     "Pushbutton": "pushbutton",
     "ESP32Touch": "esp32_touch",
     "RP2Touch": "rp2_touch",
     "Queue": "queue",
+    "RateLimiter": "ratelimit",
+    "throttle": "ratelimit",
+    "debounce": "ratelimit",
     "Semaphore": "semaphore",
     "BoundedSemaphore": "semaphore",
     "Switch": "switch",
@@ -51,13 +73,19 @@ _attrs = {
     "ELO": "events",
     "ESwitch": "events",
     "EButton": "events",
+    "InputGroup": "input_group",
     "RingbufQueue": "ringbuf_queue",
+    "PriorityQueue": "priority_queue",
+    "DeadlineQueue": "priority_queue",
     "Keyboard": "sw_array",
     "SwArray": "sw_array",
     "Broker": "broker",
     "broker": "broker",
     "Agent": "broker",
+    "Inbox": "broker",
     "RegExp": "broker",
+    "RWLock": "rwlock",
+    "RLock": "rwlock",
 }
 
 # Copied from asyncio.__init__.py
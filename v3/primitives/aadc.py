@@ -1,15 +1,21 @@
 # aadc.py AADC (asynchronous ADC) class
 
-# Copyright (c) 2020 Peter Hinch
+# Copyright (c) 2020-2026 Peter Hinch
 # Released under the MIT License (MIT) - see LICENSE file
 
 import asyncio
 import io
+from array import array
 
 MP_STREAM_POLL_RD = const(1)
 MP_STREAM_POLL = const(3)
 MP_STREAM_ERROR = const(-1)
 
+DECIMATE = const(0)  # BlockADC filter modes
+MEAN = const(1)
+MIN = const(2)
+MAX = const(3)
+
 
 class AADC(io.IOBase):
     def __init__(self, adc):
@@ -66,3 +72,87 @@ class AADC(io.IOBase):
                 self._lower = lower
                 self._upper = upper
         return self
+
+
+# A timer callback samples the ADC at a fixed rate into one half of a buffer
+# while the other half is processed. As each block of nsamples completes it is
+# reduced by factor using the filter mode, and thresholds are tested on every
+# value of the result. The ADC is read only by the timer: the cost to the
+# scheduler is a ThreadSafeFlag per block regardless of loop speed.
+class BlockADC(AADC):
+    def __init__(self, adc, timer, freq, nsamples=64, factor=1, mode=DECIMATE):
+        if nsamples % factor:
+            raise ValueError("nsamples must be a multiple of factor")
+        super().__init__(adc)
+        self._ns = nsamples
+        self._buf = array("H", [0] * (2 * nsamples))
+        self._widx = 0  # Write index of timer callback
+        self._ridx = 0  # Start of completed block
+        self._pend = False  # A completed block awaits processing
+        self._factor = factor
+        self._mode = mode
+        self._out = array("H", [0] * (nsamples // factor))
+        self._outmv = memoryview(self._out)
+        self._tsf = asyncio.ThreadSafeFlag()
+        self.overruns = 0  # Blocks lost because the task did not keep up
+        self._timer = timer
+        timer.init(freq=freq, mode=timer.PERIODIC, callback=self._tcb)
+
+    def _tcb(self, _):  # Timer callback: may be a hard ISR
+        i = self._widx
+        self._buf[i] = self._adc.read_u16()
+        i += 1
+        if i == self._ns or i == 2 * self._ns:  # Block is complete
+            if self._pend:
+                self.overruns += 1
+            self._ridx = i - self._ns
+            self._pend = True
+            self._tsf.set()
+            if i == 2 * self._ns:
+                i = 0
+        self._widx = i
+
+    def _process(self):  # Filter a completed block into ._out
+        self._pend = False
+        buf = self._buf
+        out = self._out
+        f = self._factor
+        mode = self._mode
+        i = self._ridx
+        for j in range(len(out)):
+            if mode == DECIMATE:
+                v = buf[i]
+            elif mode == MEAN:
+                v = 0
+                for k in range(i, i + f):
+                    v += buf[k]
+                v //= f
+            elif mode == MIN:
+                v = 65535
+                for k in range(i, i + f):
+                    v = min(v, buf[k])
+            else:
+                v = 0
+                for k in range(i, i + f):
+                    v = max(v, buf[k])
+            out[j] = v
+            i += f
+        self._last = v
+
+    def __iter__(self):  # Pause until a filtered value meets the threshold condition
+        while True:
+            yield from self._tsf.wait()
+            self._process()
+            for v in self._out:
+                if self._pol ^ (self._lower <= v <= self._upper):
+                    return v
+
+    # *** API ***
+
+    async def block(self):  # Pause until a block is ready. Return filtered data.
+        await self._tsf.wait()
+        self._process()
+        return self._outmv
+
+    def deinit(self):
+        self._timer.deinit()
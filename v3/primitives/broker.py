@@ -7,6 +7,7 @@
 # https://www.joeltok.com/posts/2021-03-building-an-event-bus-in-python/
 
 import asyncio
+from time import ticks_ms, ticks_diff
 from primitives import Queue, RingbufQueue, type_coro
 import re
 
@@ -15,6 +16,99 @@ class Agent:  # ABC for user agent
     pass
 
 
+# An Agent queueing messages for a consumer task. A delivery policy determines
+# what happens when the queue is full. Statistics may be read at any time.
+class Inbox(Agent):
+    DROP_NEW = 0  # Discard the message being published
+    DROP_OLD = 1  # Discard the oldest queued message
+    BLOCK = 2  # Wait up to timeout_ms for space, then discard the message
+    COALESCE = 3  # Queue only the latest message of each topic
+
+    def __init__(self, size=10, policy=DROP_NEW, timeout_ms=100):
+        self._q = RingbufQueue(size + 1)
+        self._policy = policy
+        self._tim = timeout_ms
+        self._latest = {}  # COALESCE: topic: [message, args, time]
+        self._nblocked = 0  # BLOCK: no. of tasks waiting for space
+        self.reset()
+
+    def reset(self):  # Clear statistics
+        self.delivered = 0  # Messages retrieved by the consumer
+        self.dropped = 0  # Messages discarded (or superseded) by the policy
+        self.hwm = 0  # Maximum number of messages queued
+        self.lag = 0  # ms between publication and retrieval of the last message
+        self.max_lag = 0
+
+    def qsize(self):
+        return self._q.qsize()
+
+    def empty(self):
+        return self._q.empty()
+
+    def put(self, topic, message, *args):  # Called by Broker.publish
+        q = self._q
+        t = ticks_ms()
+        policy = self._policy
+        if policy == Inbox.COALESCE:
+            if (v := self._latest.get(topic, None)) is not None:  # Already queued
+                v[0] = message
+                v[1] = args
+                v[2] = t
+                self.dropped += 1
+                return
+            if q.full():
+                self.dropped += 1
+                return
+            self._latest[topic] = [message, args, t]
+            q.put_nowait(topic)
+        elif policy == Inbox.BLOCK and (self._nblocked or q.full()):
+            self._nblocked += 1  # Later messages queue behind this one
+            asyncio.create_task(self._put((topic, message, args, t)))
+            return
+        elif policy == Inbox.DROP_NEW and q.full():
+            self.dropped += 1
+            return
+        else:
+            try:
+                q.put_nowait((topic, message, args, t))
+            except IndexError:  # RingbufQueue discarded the oldest message
+                self.dropped += 1
+        self.hwm = max(self.hwm, q.qsize())
+
+    async def _put(self, item):
+        try:
+            await asyncio.wait_for_ms(self._q.put(item), self._tim)
+            self.hwm = max(self.hwm, self._q.qsize())
+        except asyncio.TimeoutError:
+            self.dropped += 1
+        finally:
+            self._nblocked -= 1
+
+    def _retrieve(self, item):
+        if self._policy == Inbox.COALESCE:
+            topic = item
+            message, args, t = self._latest.pop(topic)
+        else:
+            topic, message, args, t = item
+        self.delivered += 1
+        self.lag = ticks_diff(ticks_ms(), t)
+        self.max_lag = max(self.max_lag, self.lag)
+        return (topic, message, args) if args else (topic, message)
+
+    # Retrieve (topic, message) or, if subscribed with args, (topic, message, args)
+    async def get(self):
+        return self._retrieve(await self._q.get())
+
+    def get_nowait(self):  # Raises IndexError if empty
+        return self._retrieve(self._q.get_nowait())
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+
 class RegExp:
     def __init__(self, re_str):
         self.re = re.compile(re_str)
@@ -33,19 +127,121 @@ def _validate(a):
     )
 
 
+# Topics with "+" levels or ending in a "#" level are MQTT style wildcards. These
+# are held in a trie over "/" separated levels. A node is a dict mapping a level
+# onto a child node; the key None maps onto the wildcard topic ending there.
+def _wild(topic):
+    if isinstance(topic, str):
+        levels = topic.split("/")
+        return "+" in levels or levels[-1] == "#"
+    return False
+
+
+def _wmatch(wtopic, topic):  # True if a string topic matches a wildcard topic
+    w = wtopic.split("/")
+    t = topic.split("/")
+    for n, level in enumerate(w):
+        if level == "#" and n == len(w) - 1:
+            return True
+        if n >= len(t) or (level != "+" and level != t[n]):
+            return False
+    return len(w) == len(t)
+
+
 class Broker(dict):
     Verbose = True
+    CacheSize = 64  # Max no. of topics whose resolved agents are cached
+    RetainSize = 32  # Max no. of retained messages
+
+    def __init__(self):
+        super().__init__()
+        self._trie = {}  # Wildcard topics
+        self._regexps = []  # RegExp topics
+        self._cache = {}  # topic: tuple of (agent, args) triggered by it
+        self._corder = []  # Cached topics, oldest first
+        self._retained = {}  # topic: message
+        self._rorder = []  # Retained topics, oldest first
+        self._tsq = None  # ThreadSafeQueue for publish_threadsafe
+        self._tsfree = 0  # Its capacity in slots
+        self._tstask = None  # Task publishing its messages
+
+    # Enable publish_threadsafe. Must be called from asyncio code. size is the
+    # maximum number of pending messages.
+    def init_threadsafe(self, size=16):
+        from threadsafe import ThreadSafeQueue
+
+        if self._tsq is None:
+            # Topic and message occupy consecutive slots so that publishing
+            # does not allocate a tuple.
+            self._tsq = ThreadSafeQueue(2 * size + 1)
+            self._tsfree = 2 * size
+            self._tstask = asyncio.create_task(self._tsdrain())
+
+    # May be called from a hard ISR or another thread but not from more than one
+    # such context. Raises IndexError if the queue is full (message is lost).
+    def publish_threadsafe(self, topic, message=None):
+        if (q := self._tsq) is None:
+            raise RuntimeError("init_threadsafe has not been called")
+        if self._tsfree - q.qsize() < 2:
+            raise IndexError
+        q.put_sync(topic)
+        q.put_sync(message)
+
+    async def _tsdrain(self):  # Publish in batches: one wakeup per batch
+        q = self._tsq
+        while True:
+            topic = await q.get()
+            self._tspublish(topic, await q.get())
+            while q.qsize() >= 2:
+                self._tspublish(q.get_sync(), q.get_sync())
+
+    def _tspublish(self, topic, message):
+        try:
+            self.publish(topic, message)
+        except Exception as e:  # A failing agent must not stop the drain task
+            ctx = {"message": "Broker agent error", "exception": e, "future": self._tstask}
+            asyncio.get_event_loop().call_exception_handler(ctx)
+
+    def get_retained(self, topic, default=None):
+        return self._retained.get(topic, default)
+
+    def _retain(self, topic, message):
+        if topic in self._retained:
+            del self._retained[topic]
+            self._rorder.remove(topic)
+        if message is not None:  # None clears the retained message
+            if len(self._rorder) >= Broker.RetainSize:
+                del self._retained[self._rorder.pop(0)]  # Discard the oldest
+            self._retained[topic] = message
+            self._rorder.append(topic)
 
     def subscribe(self, topic, agent, *args):
         if not _validate(agent):
             raise ValueError("Invalid agent:", agent)
         aa = (agent, args)
         if not (t := self.get(topic, False)):
-            self[topic] = {aa}
-        else:
-            if aa in t and Broker.Verbose:
-                print(f"Duplicate agent {aa} in topic {topic}.")
-            t.add(aa)
+            t = set()
+            if isinstance(topic, RegExp):
+                self._regexps.append(topic)
+            elif _wild(topic):
+                node = self._trie
+                for level in topic.split("/"):
+                    node = node.setdefault(level, {})
+                node[None] = topic
+            self[topic] = t
+        elif aa in t:
+            Broker.Verbose and print(f"Duplicate agent {aa} in topic {topic}.")
+            return
+        t.add(aa)
+        self._uncache()
+        # Deliver matching retained messages. Iterate over a copy: the agent may
+        # publish a retained message.
+        for rtopic, message in tuple(self._retained.items()):
+            if rtopic == topic or (
+                isinstance(rtopic, str)
+                and ((isinstance(topic, RegExp) and topic.matching(rtopic)) or (_wild(topic) and _wmatch(topic, rtopic)))
+            ):
+                self._deliver(agent, args, rtopic, message)
 
     def unsubscribe(self, topic, agent, *args):
         if topic in self:
@@ -55,35 +251,85 @@ class Broker(dict):
                 print(f"Unsubscribe agent {aa} from topic {topic} fail: agent not subscribed.")
             if len(self[topic]) == 0:
                 del self[topic]
+                if isinstance(topic, RegExp):
+                    self._regexps.remove(topic)
+                elif _wild(topic):
+                    self._unwild(self._trie, topic.split("/"), 0)
+            self._uncache()
         elif Broker.Verbose:
             print(f"Unsubscribe topic {topic} fail: topic not subscribed.")
 
-    def publish(self, topic, message=None):
-        agents = set()  # Agents which are triggered by this topic
-        if isinstance(topic, str):  # Check regexps
-            # Are any keys RegExp instances?
-            for regexp in [k for k in self.keys() if isinstance(k, RegExp)]:
+    def _uncache(self):  # Subscriptions have changed
+        self._cache.clear()
+        self._corder.clear()
+
+    def _unwild(self, node, levels, n):  # Remove a wildcard topic, pruning empty nodes
+        if n == len(levels):
+            del node[None]
+        else:
+            child = node[levels[n]]
+            self._unwild(child, levels, n + 1)
+            if not child:
+                del node[levels[n]]
+
+    def _match(self, node, levels, n, agents):  # Add agents of matching wildcard topics
+        if (child := node.get("#", None)) is not None and (wt := child.get(None, None)) is not None:
+            agents.update(self[wt])  # "#" matches this and any lower levels
+        if n == len(levels):
+            if (wt := node.get(None, None)) is not None:
+                agents.update(self[wt])
+            return
+        if (child := node.get(levels[n], None)) is not None:
+            self._match(child, levels, n + 1, agents)
+        if (child := node.get("+", None)) is not None:
+            self._match(child, levels, n + 1, agents)
+
+    def _resolve(self, topic):  # Return all (agent, args) triggered by a topic
+        agents = set()  # A set: an agent may be reached via several topics
+        if isinstance(topic, str):
+            if self._trie:
+                self._match(self._trie, topic.split("/"), 0, agents)
+            for regexp in self._regexps:  # Slow path
                 if regexp.matching(topic):
                     agents.update(self[regexp])  # Append matching agents
-        agents.update(self.get(topic, []))  # Exact match
+        agents.update(self.get(topic, ()))  # Exact match
+        agents = tuple(agents)
+        if len(self._corder) >= Broker.CacheSize:
+            del self._cache[self._corder.pop(0)]  # Discard the oldest
+        self._cache[topic] = agents
+        self._corder.append(topic)
+        return agents
+
+    # If retain is True the message is stored and delivered to agents subscribing
+    # later. Publishing None with retain True clears the topic's retained message.
+    def publish(self, topic, message=None, retain=False):
+        if retain:
+            self._retain(topic, message)
+        if not (self._trie or self._regexps):  # Only exact topics: no need to cache
+            agents = tuple(self.get(topic, ()))  # An agent may (un)subscribe
+        elif (agents := self._cache.get(topic, None)) is None:
+            agents = self._resolve(topic)  # Agents which are triggered by this topic
         for agent, args in agents:
-            if isinstance(agent, asyncio.Event):
-                agent.set()
-                continue
-            if isinstance(agent, Agent):  # User class
-                agent.put(topic, message, *args)  # Must support .put
-                continue
-            if isinstance(agent, Queue) or isinstance(agent, RingbufQueue):
-                t = (topic, message, args)
-                try:
-                    agent.put_nowait(t if args else t[:2])
-                except Exception:  # Queue discards current message. RingbufQueue discards oldest
-                    Broker.Verbose and print(f"Message lost topic {topic} message {message}")
-                continue
-            # agent is function, method, coroutine or bound coroutine
-            res = agent(topic, message, *args)
-            if isinstance(res, type_coro):
-                asyncio.create_task(res)
+            self._deliver(agent, args, topic, message)
+
+    def _deliver(self, agent, args, topic, message):
+        if isinstance(agent, asyncio.Event):
+            agent.set()
+            return
+        if isinstance(agent, Agent):  # User class
+            agent.put(topic, message, *args)  # Must support .put
+            return
+        if isinstance(agent, Queue) or isinstance(agent, RingbufQueue):
+            t = (topic, message, args)
+            try:
+                agent.put_nowait(t if args else t[:2])
+            except Exception:  # Queue discards current message. RingbufQueue discards oldest
+                Broker.Verbose and print(f"Message lost topic {topic} message {message}")
+            return
+        # agent is function, method, coroutine or bound coroutine
+        res = agent(topic, message, *args)
+        if isinstance(res, type_coro):
+            asyncio.create_task(res)
 
 
 broker = Broker()
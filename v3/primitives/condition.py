@@ -1,18 +1,25 @@
 # condition.py
 
-# Copyright (c) 2018-2020 Peter Hinch
+# Copyright (c) 2018-2026 Peter Hinch
 # Released under the MIT License (MIT) - see LICENSE file
 
 import asyncio
+from asyncio import core
+from time import ticks_add
 
 # Condition class
 # from primitives.condition import Condition
 
+# Waiting tasks are held on a TaskQueue as in asyncio.Event, so a wait involves
+# no allocation. Tasks are keyed by a sequence number rather than by time:
+# tasks queued in the same ms are notified in the order in which they waited.
+
 
 class Condition:
     def __init__(self, lock=None):
         self.lock = asyncio.Lock() if lock is None else lock
-        self.events = []
+        self._waiting = core.TaskQueue()  # Tasks awaiting notification
+        self._seq = 0  # Key of the next waiting task
 
     async def acquire(self):
         await self.lock.acquire()
@@ -40,22 +47,31 @@ class Condition:
     def notify(self, n=1):  # Caller controls lock
         if not self.lock.locked():
             raise RuntimeError("Condition notify with lock not acquired.")
-        for _ in range(min(n, len(self.events))):
-            ev = self.events.pop()
-            ev.set()
+        while n > 0 and self._waiting.peek():
+            core._task_queue.push(self._waiting.pop())
+            n -= 1
 
     def notify_all(self):
-        self.notify(len(self.events))
+        while self._waiting.peek():
+            self.notify()
+
+    # async
+    def _park(self):  # Pause until notified
+        t = core.cur_task
+        self._waiting.push(t, self._seq)
+        self._seq = ticks_add(self._seq, 1)
+        # Set calling task's data to the queue so it can be removed if cancelled
+        t.data = self._waiting
+        self.lock.release()
+        yield
 
     async def wait(self):
         if not self.lock.locked():
             raise RuntimeError("Condition wait with lock not acquired.")
-        ev = asyncio.Event()
-        self.events.append(ev)
-        self.lock.release()
-        await ev.wait()
-        await self.lock.acquire()
-        assert ev not in self.events, "condition wait assertion fail"
+        try:
+            await self._park()
+        finally:  # Hold the lock on return, even if cancelled, as in CPython
+            await self.lock.acquire()
         return True  # CPython compatibility
 
     async def wait_for(self, predicate):
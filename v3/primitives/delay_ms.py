@@ -2,64 +2,166 @@
 # Usage:
 # from primitives import Delay_ms
 
-# Copyright (c) 2018-2022 Peter Hinch
+# Copyright (c) 2018-2026 Peter Hinch
 # Released under the MIT License (MIT) - see LICENSE file
 
 import asyncio
+from asyncio import core
 from time import ticks_add, ticks_diff, ticks_ms
 from . import launch
 
+_MAXWAIT = 600_000  # Service sleeps no longer than this with no running timers
 
-class Delay_ms:
-    class DummyTimer:  # Stand-in for the timer class. Can be cancelled.
-        def cancel(self):
-            pass
 
-    _fake = DummyTimer()
+# All Delay_ms instances share one service: running instances are held on a
+# binary heap ordered by end time. Each instance records its heap index so it
+# can be moved or removed in O(log n) with no allocation. One task expires
+# timers. trigger() may be called from a hard ISR so it only updates the
+# instance and sets a ThreadSafeFlag: a second task waits on the flag and
+# reschedules the first, which then moves triggered instances on the heap.
+class _Service:
+    def __init__(self):
+        self._insts = []  # All live instances
+        self._heap = []  # Running instances: padded with None so heap never grows
+        self._n = 0  # Number of running instances
+        self._dirty = False  # An instance has been triggered
+        self._tq = None  # Task queue of the event loop running the service
+
+    def register(self, d):
+        if self._tq is not core._task_queue:  # First use or a new event loop
+            self._tq = core._task_queue
+            for x in self._insts:
+                x._hi = -1
+            self._n = 0
+            self._flag = asyncio.ThreadSafeFlag()
+            self._ttask = asyncio.create_task(self._timer())
+            asyncio.create_task(self._wake())
+        self._insts.append(d)
+        self._heap.append(None)
+
+    def deregister(self, d):
+        self.remove(d)
+        self._insts.remove(d)
+        self._heap.pop()  # Heap has a free slot
+
+    def _put(self, d, i):
+        self._heap[i] = d
+        d._hi = i
+
+    def _up(self, i):
+        h = self._heap
+        d = h[i]
+        while i:
+            p = (i - 1) >> 1
+            if ticks_diff(d._hkey, h[p]._hkey) >= 0:
+                break
+            self._put(h[p], i)
+            i = p
+        self._put(d, i)
+
+    def _down(self, i):
+        h = self._heap
+        n = self._n
+        d = h[i]
+        while (c := 2 * i + 1) < n:
+            if c + 1 < n and ticks_diff(h[c + 1]._hkey, h[c]._hkey) < 0:
+                c += 1
+            if ticks_diff(h[c]._hkey, d._hkey) >= 0:
+                break
+            self._put(h[c], i)
+            i = c
+        self._put(d, i)
+
+    def _schedule(self, d):  # Insert or move an instance to its current end time
+        d._hkey = d._tend
+        if (i := d._hi) < 0:
+            i = self._n
+            self._n += 1
+            self._put(d, i)
+        self._up(i)
+        self._down(d._hi)
+
+    def remove(self, d):
+        if (i := d._hi) >= 0:
+            d._hi = -1
+            self._n -= 1
+            last = self._heap[self._n]
+            self._heap[self._n] = None
+            if last is not d:
+                self._put(last, i)
+                self._up(i)
+                self._down(last._hi)
+
+    async def _wake(self):
+        while True:
+            await self._flag.wait()
+            tq = core._task_queue
+            tq.remove(self._ttask)  # Timer task is sleeping: run it now
+            tq.push(self._ttask)
+
+    async def _timer(self):
+        h = self._heap
+        while True:
+            if self._dirty:
+                self._dirty = False
+                for d in self._insts:
+                    if d._pend:
+                        d._pend = False  # Clear before reading ._tend
+                        self._schedule(d)
+            now = ticks_ms()
+            while self._n and ticks_diff(h[0]._hkey, now) <= 0:
+                d = h[0]
+                self.remove(d)
+                try:
+                    d._expire()
+                except Exception as e:  # A failing callback must not stop the service
+                    ctx = {"message": "Delay_ms callback error", "exception": e, "future": self._ttask}
+                    asyncio.get_event_loop().call_exception_handler(ctx)
+            await asyncio.sleep_ms(ticks_diff(h[0]._hkey, now) if self._n else _MAXWAIT)
+
+
+_service = _Service()
 
+
+class Delay_ms:
     def __init__(self, func=None, args=(), duration=1000):
         self._func = func
         self._args = args
         self._durn = duration  # Default duration
         self._retn = None  # Return value of launched callable
         self._tend = None  # Stop time (absolute ms).
+        self._hkey = None  # Stop time while on the heap
+        self._hi = -1  # Heap index
+        self._pend = False  # Triggered, not yet seen by the service
         self._busy = False
-        self._trig = asyncio.ThreadSafeFlag()
+        self._live = True
         self._tout = asyncio.Event()  # Timeout event
         self.wait = self._tout.wait  # Allow: await wait_ms.wait()
         self.clear = self._tout.clear
         self.set = self._tout.set
-        self._ttask = self._fake  # Timer task
-        self._mtask = asyncio.create_task(self._run())  # Main task
+        _service.register(self)
 
-    async def _run(self):
-        while True:
-            await self._trig.wait()  # Await a trigger
-            self._ttask.cancel()  # Cancel and replace
-            await asyncio.sleep_ms(0)
-            dt = max(ticks_diff(self._tend, ticks_ms()), 0)  # Beware already elapsed.
-            self._ttask = asyncio.create_task(self._timer(dt))
-
-    async def _timer(self, dt):
-        await asyncio.sleep_ms(dt)
-        self._tout.set()  # Only gets here if not cancelled.
-        self._busy = False
+    def _expire(self):
+        self._tout.set()
+        self._busy = self._pend  # Retriggered since the service last looked
         if self._func is not None:
             self._retn = launch(self._func, self._args)
 
     # API
     # trigger may be called from hard ISR.
     def trigger(self, duration=0):  # Update absolute end time, 0-> ctor default
-        if self._mtask is None:
+        if not self._live:
             raise RuntimeError("Delay_ms.deinit() has run.")
         self._tend = ticks_add(ticks_ms(), duration if duration > 0 else self._durn)
         self._retn = None  # Default in case cancelled.
         self._busy = True
-        self._trig.set()
+        self._pend = True
+        _service._dirty = True
+        _service._flag.set()
 
     def stop(self):
-        self._ttask.cancel()
-        self._ttask = self._fake
+        self._pend = False
+        _service.remove(self)
         self._busy = False
         self._tout.clear()
 
@@ -76,7 +178,7 @@ class Delay_ms:
         self._args = args
 
     def deinit(self):
-        if self._mtask is not None:  # https://github.com/peterhinch/micropython-async/issues/98
+        if self._live:  # https://github.com/peterhinch/micropython-async/issues/98
             self.stop()
-            self._mtask.cancel()
-            self._mtask = None
+            _service.deregister(self)
+            self._live = False
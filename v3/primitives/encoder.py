@@ -1,6 +1,6 @@
 # encoder.py Asynchronous driver for incremental quadrature encoder.
 
-# Copyright (c) 2021-2024 Peter Hinch
+# Copyright (c) 2021-2026 Peter Hinch
 # Released under the MIT License (MIT) - see LICENSE file
 
 # For an explanation of the design please see
@@ -20,43 +20,24 @@
 # Now uses ThreadSafeFlag.clear()
 
 import asyncio
-from machine import Pin
+from time import ticks_ms, ticks_diff
 
 
-class Encoder:
-    def __init__(
-        self,
-        pin_x,
-        pin_y,
-        v=0,
-        div=1,
-        vmin=None,
-        vmax=None,
-        mod=None,
-        callback=lambda a, b: None,
-        args=(),
-        delay=100,
-    ):
+class _Quad:  # Hardware count of one encoder maintained by pin interrupts
+    def __init__(self, pin_x, pin_y, hv, tsf):
         self._pin_x = pin_x
         self._pin_y = pin_y
         self._x = pin_x()
         self._y = pin_y()
-        self._v = v * div  # Initialise hardware value
-        self._cv = v  # Current (divided) value
-        self.delay = delay  # Pause (ms) for motion to stop/limit callback frequency
-        self._trig = asyncio.Event()
-
-        if ((vmin is not None) and v < vmin) or ((vmax is not None) and v > vmax):
-            raise ValueError("Incompatible args: must have vmin <= v <= vmax")
-        self._tsf = asyncio.ThreadSafeFlag()
-        trig = Pin.IRQ_RISING | Pin.IRQ_FALLING
+        self._v = hv  # Hardware value
+        self._tsf = tsf  # Set on movement
+        trig = pin_x.IRQ_RISING | pin_x.IRQ_FALLING
         try:
             xirq = pin_x.irq(trigger=trig, handler=self._x_cb, hard=True)
             yirq = pin_y.irq(trigger=trig, handler=self._y_cb, hard=True)
         except TypeError:  # hard arg is unsupported on some hosts
             xirq = pin_x.irq(trigger=trig, handler=self._x_cb)
             yirq = pin_y.irq(trigger=trig, handler=self._y_cb)
-        asyncio.create_task(self._run(vmin, vmax, div, mod, callback, args))
 
     # Hardware IRQ's. Duration 36μs on Pyboard 1 ~50μs on ESP32.
     # IRQ latency: 2nd edge may have occured by the time ISR runs, in
@@ -73,6 +54,30 @@ class Encoder:
             self._v -= 1 if y ^ self._pin_x() else -1
             self._tsf.set()
 
+
+class Encoder(_Quad):
+    def __init__(
+        self,
+        pin_x,
+        pin_y,
+        v=0,
+        div=1,
+        vmin=None,
+        vmax=None,
+        mod=None,
+        callback=lambda a, b: None,
+        args=(),
+        delay=100,
+    ):
+        self._cv = v  # Current (divided) value
+        self.delay = delay  # Pause (ms) for motion to stop/limit callback frequency
+        self._trig = asyncio.Event()
+
+        if ((vmin is not None) and v < vmin) or ((vmax is not None) and v > vmax):
+            raise ValueError("Incompatible args: must have vmin <= v <= vmax")
+        super().__init__(pin_x, pin_y, v * div, asyncio.ThreadSafeFlag())
+        asyncio.create_task(self._run(vmin, vmax, div, mod, callback, args))
+
     async def _run(self, vmin, vmax, div, mod, cb, args):
         pv = self._v  # Prior hardware value
         pcv = self._cv  # Prior divided value passed to callback
@@ -111,3 +116,95 @@ class Encoder:
 
     def value(self):
         return self._cv
+
+
+# All encoders in a bank share one ThreadSafeFlag and one task. After an edge
+# the task samples every hardware count once per period until motion stops,
+# then waits on the flag. Division, limits and modulo use integer arithmetic:
+# division rounds half up. Velocities are in divided units per second.
+class EncoderBank:
+    def __init__(self, period=100):
+        self.period = period  # Sample interval (ms) while any encoder is moving
+        self._tsf = asyncio.ThreadSafeFlag()
+        self._trig = asyncio.Event()
+        self._quads = []
+        self._cfg = []  # (div, vmin, vmax, mod) for each encoder
+        self._pv = []  # Prior hardware value
+        self._pcv = []  # Prior divided value
+        self._lcv = []  # Divided value after limits applied
+        self._vel = []  # Velocity
+        self._changed = 0  # Bitmap of encoders updated since last iteration
+        self._moving = False  # Any hardware count changed in the last period
+        self._task = None
+
+    # Add an encoder. Args are as per Encoder. Returns its index in the bank.
+    def add(self, pin_x, pin_y, v=0, div=1, vmin=None, vmax=None, mod=None):
+        if ((vmin is not None) and v < vmin) or ((vmax is not None) and v > vmax):
+            raise ValueError("Incompatible args: must have vmin <= v <= vmax")
+        self._quads.append(_Quad(pin_x, pin_y, v * div, self._tsf))
+        self._cfg.append((div, vmin, vmax, mod))
+        self._pv.append(v * div)
+        self._pcv.append(v)
+        self._lcv.append(v)
+        self._vel.append(0)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return len(self._quads) - 1
+
+    def _sample(self, dt):  # Return a bitmap of encoders whose value or velocity changed
+        changed = 0
+        self._moving = False
+        for n, q in enumerate(self._quads):
+            hv = q._v  # Atomic read
+            if dhv := hv - self._pv[n]:
+                self._moving = True
+            self._pv[n] = hv
+            div, vmin, vmax, mod = self._cfg[n]
+            vel = (2000 * dhv + dt * div) // (2 * dt * div)
+            if vel != self._vel[n]:
+                self._vel[n] = vel
+                changed |= 1 << n
+            cv = (2 * hv + div) // (2 * div)
+            if dv := cv - self._pcv[n]:
+                self._pcv[n] = cv
+                lcv = self._lcv[n] + dv
+                lcv = lcv if vmax is None else min(vmax, lcv)
+                lcv = lcv if vmin is None else max(vmin, lcv)
+                lcv = lcv if mod is None else lcv % mod
+                if lcv != self._lcv[n]:
+                    self._lcv[n] = lcv
+                    changed |= 1 << n
+        return changed
+
+    async def _run(self):
+        while True:
+            if not self._moving:
+                self._tsf.clear()
+                await self._tsf.wait()  # A stopped bank waits here
+                t = ticks_ms()
+            await asyncio.sleep_ms(self.period)
+            now = ticks_ms()
+            dt = max(ticks_diff(now, t), 1)
+            t = now
+            if changed := self._sample(dt):
+                self._changed |= changed
+                self._trig.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):  # Return a bitmap of updated encoders
+        await self._trig.wait()
+        self._trig.clear()
+        changed = self._changed
+        self._changed = 0
+        return changed
+
+    def __len__(self):
+        return len(self._quads)
+
+    def value(self, n):
+        return self._lcv[n]
+
+    def velocity(self, n):
+        return self._vel[n]
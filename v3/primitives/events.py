@@ -1,10 +1,10 @@
 # events.py Event based primitives
 
-# Copyright (c) 2022-2024 Peter Hinch
+# Copyright (c) 2022-2026 Peter Hinch
 # Released under the MIT License (MIT) - see LICENSE file
 
 import asyncio
-from . import Delay_ms
+from . import Delay_ms, _irq_poll
 from . import RingbufQueue
 
 # An Event-like class that can wait on an iterable of Event-like instances.
@@ -113,19 +113,33 @@ class ELO:
 class ESwitch:
     debounce_ms = 50
 
-    def __init__(self, pin, lopen=1):  # Default is n/o switch returned to gnd
+    def __init__(self, pin, lopen=1, group=None, irq=False):  # Default is n/o switch returned to gnd
         self._pin = pin  # Should be initialised for input with pullup
         self._lopen = lopen  # Logic level in "open" state
         self.open = asyncio.Event()
         self.close = asyncio.Event()
         self._state = self._pin() ^ self._lopen  # Get initial state
-        asyncio.create_task(self._poll(ESwitch.debounce_ms))
+        self._group = group
+        if group is not None:  # Group task polls the pin
+            self._gcb = self._check
+            group.add(pin, lopen, self._gcb)
+        elif irq:  # Wake on pin edges
+            self._task = asyncio.create_task(_irq_poll(pin, self._read, self._check, ESwitch.debounce_ms))
+        else:
+            self._task = asyncio.create_task(self._poll(ESwitch.debounce_ms))
+
+    def _read(self):
+        return self._pin() ^ self._lopen  # 15μs
+
+    def _check(self, s):
+        if s != self._state:
+            self._state = s
+            self._cf() if s else self._of()
+            return True
 
     async def _poll(self, dt):  # Poll the button
         while True:
-            if (s := self._pin() ^ self._lopen) != self._state:  # 15μs
-                self._state = s
-                self._cf() if s else self._of()
+            self._check(self._read())
             await asyncio.sleep_ms(dt)  # Wait out bounce
 
     def _of(self):
@@ -140,7 +154,10 @@ class ESwitch:
         return self._state
 
     def deinit(self):
-        self._poll.cancel()
+        if self._group is None:
+            self._task.cancel()
+        else:
+            self._group.remove(self._gcb)
         self.open.clear()
         self.close.clear()
 
@@ -151,7 +168,7 @@ class EButton:
     long_press_ms = 1000
     double_click_ms = 400
 
-    def __init__(self, pin, suppress=False, sense=None):
+    def __init__(self, pin, suppress=False, sense=None, group=None, irq=False):
         self._pin = pin  # Initialise for input
         self._supp = suppress
         self._sense = pin() if sense is None else sense
@@ -162,17 +179,29 @@ class EButton:
         self.double = asyncio.Event()
         self.long = asyncio.Event()
         self.release = asyncio.Event()  # *** END API ***
-        # Tasks run forever. Poll contacts
-        self._tasks = [asyncio.create_task(self._poll(EButton.debounce_ms))]
+        # Tasks run forever. Poll contacts unless a group task does so
+        self._group = group
+        self._tasks = []
+        if group is not None:
+            self._gcb = self._check
+            group.add(pin, self._sense, self._gcb)
+        elif irq:  # Wake on pin edges
+            self._tasks.append(asyncio.create_task(_irq_poll(pin, self.rawstate, self._check, EButton.debounce_ms)))
+        else:
+            self._tasks.append(asyncio.create_task(self._poll(EButton.debounce_ms)))
         self._tasks.append(asyncio.create_task(self._ltf()))  # Handle long press
         if suppress:
             self._tasks.append(asyncio.create_task(self._dtf()))  # Double timer
 
+    def _check(self, s):
+        if (s := bool(s)) != self._state:
+            self._state = s
+            self._pf() if s else self._rf()
+            return True
+
     async def _poll(self, dt):  # Poll the button
         while True:
-            if (s := self.rawstate()) != self._state:
-                self._state = s
-                self._pf() if s else self._rf()
+            self._check(self.rawstate())
             await asyncio.sleep_ms(dt)  # Wait out bounce
 
     def _pf(self):  # Button press
@@ -217,5 +246,7 @@ class EButton:
     def deinit(self):
         for task in self._tasks:
             task.cancel()
+        if self._group is not None:
+            self._group.remove(self._gcb)
         for evt in (self.press, self.double, self.long, self.release):
             evt.clear()
@@ -0,0 +1,91 @@
+# input_group.py Sample a group of switches and pushbuttons with one task
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Switch, Pushbutton, ESwitch and EButton instances constructed with a group
+# arg have no polling task of their own. The group task reads every pin once
+# per debounce period into bitmaps of logical state. Changes are found for 30
+# inputs at a time by XOR with the previous state and only the members whose
+# state changed are called. Bitmaps are lists of words holding 30 bits, so on
+# MicroPython all arithmetic is on small ints and a tick does not allocate.
+
+import asyncio
+from micropython import const
+
+_W = const(30)  # Inputs per word
+
+
+class InputGroup:
+    def __init__(self, debounce_ms=50):
+        self._dt = debounce_ms
+        self._pins = []
+        self._senses = []  # Pin value corresponding to logical 0
+        self._funcs = []  # Called with new logical state 0 or 1
+        self._inv = []  # Words of senses
+        self._state = []  # Words of current logical state
+        self._task = None
+        self.ticks = 0  # Number of times the group has been sampled
+
+    def _states(self):  # Logical state of each input
+        return [(self._state[n // _W] >> (n % _W)) & 1 for n in range(len(self._pins))]
+
+    def _build(self, states):  # Recreate words from per-input data
+        self._inv = [0] * ((len(self._pins) + _W - 1) // _W)
+        self._state = self._inv[:]
+        for n, sense in enumerate(self._senses):
+            k, b = divmod(n, _W)
+            if sense:
+                self._inv[k] |= 1 << b
+            if states[n]:
+                self._state[k] |= 1 << b
+
+    # Add an input: used by the constructors of the switch and button classes
+    def add(self, pin, sense, func):
+        states = self._states()
+        states.append(pin() ^ sense)
+        self._pins.append(pin)
+        self._senses.append(sense)
+        self._funcs.append(func)
+        self._build(states)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def remove(self, func):
+        n = self._funcs.index(func)
+        states = self._states()
+        for x in (self._pins, self._senses, self._funcs, states):
+            x.pop(n)
+        self._build(states)  # Task ends when the group is empty
+
+    def __len__(self):
+        return len(self._pins)
+
+    async def _run(self):
+        pins = self._pins
+        funcs = self._funcs
+        while pins:
+            npins = len(pins)
+            n = 0  # Index of first input in word
+            for k in range(len(self._state)):
+                word = 0
+                for i in range(n, min(n + _W, npins)):
+                    if pins[i]():
+                        word |= 1 << (i - n)  # Bit 29 at most: a small int
+                if ch := word ^ self._inv[k] ^ self._state[k]:  # Changed inputs
+                    self._state[k] = s = self._state[k] ^ ch
+                    i = n
+                    while ch:
+                        if ch & 1:
+                            funcs[i](s & 1)
+                            if len(pins) != npins:  # A callback removed an input
+                                break
+                        ch >>= 1
+                        s >>= 1
+                        i += 1
+                if len(pins) != npins:
+                    break
+                n += _W
+            self.ticks += 1
+            await asyncio.sleep_ms(self._dt)  # Wait out bounce
+        self._task = None
@@ -0,0 +1,31 @@
+# Freeze the primitives package into firmware. Tests are omitted. Add to a
+# board manifest with:
+# include("<path to micropython-async>/v3/primitives/manifest.py")
+package(
+    "primitives",
+    (
+        "__init__.py",
+        "aadc.py",
+        "barrier.py",
+        "broker.py",
+        "condition.py",
+        "delay_ms.py",
+        "encoder.py",
+        "esp32_touch.py",
+        "events.py",
+        "input_group.py",
+        "priority_queue.py",
+        "pushbutton.py",
+        "queue.py",
+        "ratelimit.py",
+        "ringbuf_queue.py",
+        "rp2_touch.py",
+        "rwlock.py",
+        "semaphore.py",
+        "switch.py",
+        "sw_array.py",
+        "waitq.py",
+    ),
+    base_path="..",
+    opt=3,
+)
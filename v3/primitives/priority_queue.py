@@ -0,0 +1,121 @@
+# priority_queue.py Provides PriorityQueue and DeadlineQueue classes
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# API as per RingbufQueue: differs from CPython
+# Items are held on a heap as (key, sequence number, item) tuples. The sequence
+# number ensures that items with equal keys are retrieved in FIFO order.
+# Asynchronous iterator allowing consumer to use async for
+
+from heapq import heappush, heappop
+from time import ticks_ms, ticks_diff
+from .waitq import WaitQueue
+
+
+class PriorityQueue:
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self._q = []
+        self._seq = 0
+        self._getw = WaitQueue()  # Tasks waiting on get
+        self._putw = WaitQueue()  # Tasks waiting on put
+
+    def qsize(self):
+        return len(self._q)
+
+    def empty(self):
+        return not self.qsize()
+
+    def full(self):  # Never True if maxsize is 0
+        return self.maxsize > 0 and self.qsize() >= self.maxsize
+
+    def _push(self, key, v):
+        if not self._q:
+            self._seq = 0  # Keep sequence numbers small
+        heappush(self._q, (key, self._seq, v))
+        self._seq += 1
+        self._getw.wake()  # Schedule first task waiting on get
+
+    def put_nowait(self, v, pri=0):  # Items with lower pri values are retrieved first
+        if self.full():
+            raise IndexError
+        self._push(pri, v)
+
+    async def put(self, v, pri=0):  # Usage: await queue.put(item, pri)
+        if self._putw.waiting() or self.full():
+            # Queue behind any waiting tasks until a get occurs
+            await self._putw.wait()
+            while self.full():  # Space was taken by put_nowait()
+                await self._putw.wait()
+        self.put_nowait(v, pri)
+        if not self.full():
+            self._putw.wake()  # Space remains for any further putter
+
+    def peek(self):  # Return next item without removing it from the queue.
+        if self.empty():
+            raise IndexError
+        return self._q[0][2]
+
+    def get_nowait(self):  # Remove and return an item from the queue.
+        if self.empty():
+            raise IndexError
+        return self._get()
+
+    def _get(self):
+        v = heappop(self._q)[2]
+        self._putw.wake()  # Schedule first task waiting on put
+        if not self.empty():
+            self._getw.wake()  # Items remain for any further getter
+        return v
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    async def get(self):
+        if self._getw.waiting() or self.empty():
+            await self._getw.wait()
+            while self.empty():  # Item was taken by get_nowait()
+                await self._getw.wait()
+        return self._get()
+
+
+# Items are retrieved in order of deadline. Items whose deadline has passed are
+# discarded: being at the head of the heap this is done cheaply by any method
+# which checks the queue's size. The number discarded is held in .expired
+class DeadlineQueue(PriorityQueue):
+    def __init__(self, maxsize=0):
+        super().__init__(maxsize)
+        self._t0 = ticks_ms()  # Keys are deadlines in ms relative to this time
+        self.expired = 0
+
+    def qsize(self):
+        q = self._q
+        now = ticks_diff(ticks_ms(), self._t0)
+        n = len(q)
+        while q and q[0][0] < now:  # Discard expired items
+            heappop(q)
+            self.expired += 1
+        if len(q) < n:
+            self._putw.wake()
+        return len(q)
+
+    # Item will expire if not retrieved within timeout_ms
+    def put_nowait(self, v, timeout_ms):
+        if self.full():
+            raise IndexError
+        now = ticks_ms()
+        if not self._q:
+            self._t0 = now
+        elif (dt := ticks_diff(now, self._t0)) > 0x100000:  # ~17 minutes
+            # Rebase keys long before ticks_diff could overflow. Subtracting a
+            # constant from each key preserves the heap order.
+            self._q = [(k - dt, s, x) for k, s, x in self._q]
+            self._t0 = now
+        self._push(ticks_diff(now, self._t0) + timeout_ms, v)
+
+    async def put(self, v, timeout_ms):  # Usage: await queue.put(item, timeout_ms)
+        await PriorityQueue.put(self, v, timeout_ms)
@@ -5,7 +5,7 @@
 
 import asyncio
 import time
-from . import launch, Delay_ms
+from . import launch, Delay_ms, _irq_poll
 
 
 class Pushbutton:
@@ -13,7 +13,7 @@ class Pushbutton:
     long_press_ms = 1000
     double_click_ms = 400
 
-    def __init__(self, pin, suppress=False, sense=None):
+    def __init__(self, pin, suppress=False, sense=None, group=None, irq=False):
         self._pin = pin  # Initialise for input
         self._supp = suppress
         self._dblpend = False  # Doubleclick waiting for 2nd click
@@ -26,7 +26,15 @@ class Pushbutton:
         # Convert from electrical to logical value
         self._sense = pin.value() if sense is None else sense
         self._state = self.rawstate()  # Initial state
-        self._run = asyncio.create_task(self._go())  # Thread runs forever
+        self._group = group
+        if group is None:  # Task runs forever
+            if irq:  # Wake on pin edges
+                self._run = asyncio.create_task(_irq_poll(pin, self.rawstate, self._check, Pushbutton.debounce_ms))
+            else:
+                self._run = asyncio.create_task(self._go())
+        else:  # Group task polls the pin
+            self._gcb = lambda s: self._check(bool(s))
+            group.add(pin, self._sense, self._gcb)
 
     async def _go(self):
         while True:
@@ -70,6 +78,7 @@ class Pushbutton:
             if self._ld:
                 self._ld.stop()  # Avoid interpreting a second click as a long push
             self._dblran = False
+        return True
 
     def _ddto(self):  # Doubleclick timeout: no doubleclick occurred
         self._dblpend = False
@@ -123,4 +132,7 @@ class Pushbutton:
         return self._state
 
     def deinit(self):
-        self._run.cancel()
+        if self._group is None:
+            self._run.cancel()
+        else:
+            self._group.remove(self._gcb)
@@ -5,8 +5,11 @@
 
 # Code is based on Paul Sokolovsky's work.
 # This is a temporary solution until asyncio V3 gets an efficient official version
+# Waiting tasks are queued FIFO. Each put() or get() wakes only the first task
+# waiting on the other side, so an item costs one wakeup however many wait.
 
 import asyncio
+from .waitq import WaitQueue
 
 
 # Exception raised by get_nowait().
@@ -22,55 +25,114 @@ class QueueFull(Exception):
 class Queue:
     def __init__(self, maxsize=0):
         self.maxsize = maxsize
+        # Items are appended to a list and read from index _ri. Consumed items
+        # are deleted in bulk, making each get O(1) rather than list.pop(0).
         self._queue = []
-        self._evput = asyncio.Event()  # Triggered by put, tested by get
-        self._evget = asyncio.Event()  # Triggered by get, tested by put
+        self._ri = 0
+        self._getw = WaitQueue()  # Tasks waiting on get
+        self._putw = WaitQueue()  # Tasks waiting on put
 
         self._jncnt = 0
         self._jnevt = asyncio.Event()
         self._upd_jnevt(0)  # update join event
 
+    def _advance(self, n):  # n items have been removed
+        q = self._queue
+        ri = self._ri + n
+        if ri == len(q):
+            q.clear()
+            ri = 0
+        elif ri > 16 and ri > len(q) // 2:  # Compact
+            del q[:ri]
+            ri = 0
+        self._ri = ri
+        self._putw.wake()  # Schedule first task waiting on put
+        if not self.empty():
+            self._getw.wake()  # Items remain for any further getter
+
+    def _take(self, n):  # Remove and return a list of up to n items
+        r = self._queue[self._ri : self._ri + n]
+        self._advance(len(r))
+        return r
+
     def _get(self):
-        self._evget.set()  # Schedule all tasks waiting on get
-        self._evget.clear()
-        return self._queue.pop(0)
+        q = self._queue
+        r = q[self._ri]
+        q[self._ri] = None  # Release the reference
+        self._advance(1)
+        return r
+
+    async def _wait_get(self):  # Queue behind any waiting tasks until a put occurs
+        if self._getw.waiting() or self.empty():
+            await self._getw.wait()
+            while self.empty():  # Item was taken by get_nowait()
+                await self._getw.wait()
 
     async def get(self):  #  Usage: item = await queue.get()
-        while self.empty():  # May be multiple tasks waiting on get()
-            # Queue is empty, suspend task until a put occurs
-            # 1st of N tasks gets, the rest loop again
-            await self._evput.wait()
+        await self._wait_get()
         return self._get()
 
+    # Wait until the queue is not empty, then remove and return a list of up to
+    # max_n items. Waiting putters are woken once for the batch.
+    async def get_many(self, max_n):
+        await self._wait_get()
+        return self._take(max_n)
+
     def get_nowait(self):  # Remove and return an item from the queue.
         # Return an item if one is immediately available, else raise QueueEmpty.
         if self.empty():
             raise QueueEmpty()
         return self._get()
 
+    def get_nowait_many(self, max_n):  # Return a list of up to max_n items.
+        # The list is empty if no item is available.
+        return self._take(max_n)
+
+    def _added(self, n):  # n items have been added
+        if n:
+            self._upd_jnevt(n)  # update join event
+            self._getw.wake()  # Schedule first task waiting on get
+        if not self.full():
+            self._putw.wake()  # Space remains for any further putter
+
     def _put(self, val):
-        self._upd_jnevt(1)  # update join event
-        self._evput.set()  # Schedule tasks waiting on put
-        self._evput.clear()
         self._queue.append(val)
+        self._added(1)
+
+    async def _wait_put(self):  # Queue behind any waiting tasks until a get occurs
+        if self._putw.waiting() or self.full():
+            await self._putw.wait()
+            while self.full():  # Space was taken by put_nowait()
+                await self._putw.wait()
 
     async def put(self, val):  # Usage: await queue.put(item)
-        while self.full():
-            # Queue full
-            await self._evget.wait()
-            # Task(s) waiting to get from queue, schedule first Task
+        await self._wait_put()
         self._put(val)
 
+    # Put all items from an iterable. Waiting getters are woken once per batch:
+    # a batch ends when the iterable is exhausted or the queue becomes full.
+    async def put_many(self, items):
+        await self._wait_put()
+        n = 0
+        for val in items:
+            if self.full():
+                self._added(n)
+                n = 0
+                await self._wait_put()
+            self._queue.append(val)
+            n += 1
+        self._added(n)
+
     def put_nowait(self, val):  # Put an item into the queue without blocking.
         if self.full():
             raise QueueFull()
         self._put(val)
 
     def qsize(self):  # Number of items in the queue.
-        return len(self._queue)
+        return len(self._queue) - self._ri
 
     def empty(self):  # Return True if the queue is empty, False otherwise.
-        return len(self._queue) == 0
+        return len(self._queue) == self._ri
 
     def full(self):  # Return True if there are maxsize items in the queue.
         # Note: if the Queue was initialized with maxsize=0 (the default) or
@@ -0,0 +1,124 @@
+# ratelimit.py Token bucket rate limiter and throttle/debounce wrappers
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Usage:
+# from primitives import RateLimiter, throttle, debounce
+
+import asyncio
+from time import ticks_ms, ticks_diff
+from . import launch
+from .delay_ms import Delay_ms
+from .waitq import WaitQueue
+
+
+# The bucket holds millitokens so that refilling at rate tokens/s adds rate
+# millitokens per ms: arithmetic is integer. The bucket is refilled when it is
+# accessed so there is no task. Waiting tasks acquire in FIFO order: only the
+# first sleeps until enough tokens accrue, the rest wait on a WaitQueue.
+class RateLimiter:
+    def __init__(self, rate, burst=1):
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate and burst must be > 0")
+        self._rate = rate  # Tokens per second
+        self._cap = burst * 1000  # Bucket size in millitokens
+        self._mt = self._cap  # Bucket starts full
+        self._t = ticks_ms()  # Time of last refill
+        self._busy = False  # A task is waiting for tokens to accrue
+        self._waiting = WaitQueue()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def _refill(self):
+        now = ticks_ms()
+        if (dt := ticks_diff(now, self._t)) > 0:
+            self._mt = min(self._cap, self._mt + dt * self._rate)
+            self._t = now
+
+    def _check(self, n):
+        if not 0 < n * 1000 <= self._cap:
+            raise ValueError("Tokens requested must be in range 1 to burst")
+
+    def tokens(self):  # Number of tokens available
+        self._refill()
+        return self._mt // 1000
+
+    def try_acquire(self, n=1):  # Take n tokens if available without waiting
+        self._check(n)
+        if self._busy or self._waiting.waiting():
+            return False  # Waiting tasks have priority
+        self._refill()
+        if self._mt < n * 1000:
+            return False
+        self._mt -= n * 1000
+        return True
+
+    async def acquire(self, n=1):  # Pause until n tokens are available and take them
+        self._check(n)
+        if self._busy or self._waiting.waiting():
+            await self._waiting.wait()  # Queue behind waiting tasks
+        self._busy = True
+        try:
+            self._refill()
+            while (d := n * 1000 - self._mt) > 0:
+                await asyncio.sleep_ms((d + self._rate - 1) // self._rate)
+                self._refill()
+            self._mt -= n * 1000
+        finally:
+            self._busy = False
+            self._waiting.wake()
+
+
+# Wrappers for a callback or coro, called with positional args as per launch.
+# Each has a Delay_ms so all share the Delay_ms service task.
+class _Throttle:
+    def __init__(self, func, ms):
+        self._func = func
+        self._args = None  # Args of the latest call suppressed in this period
+        self._dly = Delay_ms(self._expire, (), ms)
+
+    def _expire(self):
+        if (args := self._args) is not None:
+            self._args = None
+            self._dly.trigger()
+            launch(self._func, args)
+
+    def __call__(self, *args):
+        if self._dly():
+            self._args = args
+            return None
+        self._dly.trigger()
+        return launch(self._func, args)
+
+    def deinit(self):
+        self._dly.deinit()
+
+
+class _Debounce:
+    def __init__(self, func, ms):
+        self._func = func
+        self._dly = Delay_ms(duration=ms)
+
+    def __call__(self, *args):
+        self._dly.callback(self._func, args)
+        self._dly.trigger()
+
+    def deinit(self):
+        self._dly.deinit()
+
+
+# Run func at once, then at most once per ms. If calls occur during that time,
+# func runs at its end with the args of the latest of them.
+def throttle(func, ms):
+    return _Throttle(func, ms)
+
+
+# Run func when ms have elapsed since the latest call, with its args.
+def debounce(func, ms):
+    return _Debounce(func, ms)
@@ -8,19 +8,25 @@
 # Asynchronous iterator allowing consumer to use async for
 # put_nowait QueueFull exception can be ignored allowing oldest data to be discarded -
 # this is not thread safe. Nor is the class as a whole TS because of its use of
-# Event objects.
+# task queues.
+# Waiting tasks are queued FIFO: each put or get wakes only the first task
+# waiting on the other side.
 
-import asyncio
+from .waitq import WaitQueue
 
 
 class RingbufQueue:  # MicroPython optimised
     def __init__(self, buf):
         self._q = [0 for _ in range(buf)] if isinstance(buf, int) else buf
+        try:  # Bulk copies use slices of a memoryview to avoid copying data twice
+            self._mv = memoryview(self._q)
+        except TypeError:  # list
+            self._mv = self._q
         self._size = len(self._q)
         self._wi = 0
         self._ri = 0
-        self._evput = asyncio.Event()  # Triggered by put, tested by get
-        self._evget = asyncio.Event()  # Triggered by get, tested by put
+        self._getw = WaitQueue()  # Tasks waiting on get
+        self._putw = WaitQueue()  # Tasks waiting on put
 
     def full(self):
         return ((self._wi + 1) % self._size) == self._ri
@@ -35,12 +41,19 @@ class RingbufQueue:  # MicroPython optimised
         # Return an item if one is immediately available, else raise QueueEmpty.
         if self.empty():
             raise IndexError
+        return self._get()
+
+    def _get(self):
         r = self._q[self._ri]
-        self._ri = (self._ri + 1) % self._size
-        self._evget.set()  # Schedule all tasks waiting on ._evget
-        self._evget.clear()
+        self._removed(1)
         return r
 
+    def _removed(self, n):  # n items have been removed
+        self._ri = (self._ri + n) % self._size
+        self._putw.wake()  # Schedule first task waiting on put
+        if not self.empty():
+            self._getw.wake()  # Items remain for any further getter
+
     def peek(self):  # Return oldest item from the queue without removing it.
         # Return an item if one is immediately available, else raise QueueEmpty.
         if self.empty():
@@ -49,18 +62,38 @@ class RingbufQueue:  # MicroPython optimised
 
     def put_nowait(self, v):
         self._q[self._wi] = v
-        self._evput.set()  # Schedule any tasks waiting on get
-        self._evput.clear()
+        self._getw.wake()  # Schedule first task waiting on get
         self._wi = (self._wi + 1) % self._size
         if self._wi == self._ri:  # Would indicate empty
             self._ri = (self._ri + 1) % self._size  # Discard a message
             raise IndexError  # Caller can ignore if overwrites are OK
 
+    # Copy items from buf to the queue, returning the number copied. Copying stops
+    # when the queue is full. buf must be of the same type as the queue's buffer
+    # or a memoryview of it. A waiting task is woken once for the batch.
+    def put_from(self, buf):
+        mv = self._mv
+        size = self._size
+        wi = self._wi
+        n = min(len(buf), (self._ri - wi - 1) % size)
+        k = min(n, size - wi)  # Number which fit before wrap
+        mv[wi : wi + k] = buf[:k]
+        if n > k:
+            mv[: n - k] = buf[k:n]
+        self._wi = (wi + n) % size
+        if n:
+            self._getw.wake()  # Schedule first task waiting on get
+        return n
+
     async def put(self, val):  # Usage: await queue.put(item)
-        while self.full():  # Queue full
-            await self._evget.wait()  # May be >1 task waiting on ._evget
-            # Task(s) waiting to get from queue, schedule first Task
+        if self._putw.waiting() or self.full():
+            # Queue behind any waiting tasks until a get occurs
+            await self._putw.wait()
+            while self.full():  # Space was taken by put_nowait()
+                await self._putw.wait()
         self.put_nowait(val)
+        if not self.full():
+            self._putw.wake()  # Space remains for any further putter
 
     def __aiter__(self):
         return self
@@ -68,11 +101,27 @@ class RingbufQueue:  # MicroPython optimised
     async def __anext__(self):
         return await self.get()
 
+    async def _wait_get(self):  # Queue behind any waiting tasks until a put occurs
+        if self._getw.waiting() or self.empty():
+            await self._getw.wait()
+            while self.empty():  # Item was taken by get_nowait()
+                await self._getw.wait()
+
     async def get(self):
-        while self.empty():  # Empty. May be more than one task waiting on ._evput
-            await self._evput.wait()
-        r = self._q[self._ri]
-        self._ri = (self._ri + 1) % self._size
-        self._evget.set()  # Schedule all tasks waiting on ._evget
-        self._evget.clear()
-        return r
+        await self._wait_get()
+        return self._get()
+
+    # Wait until the queue is not empty, then copy as many items as are available
+    # into buf (up to its length), returning the number copied. Types are as for
+    # put_from.
+    async def get_into(self, buf):
+        await self._wait_get()
+        mv = self._mv
+        ri = self._ri
+        n = min(len(buf), self.qsize())
+        k = min(n, self._size - ri)  # Number before wrap
+        buf[:k] = mv[ri : ri + k]
+        if n > k:
+            buf[k:n] = mv[: n - k]
+        self._removed(n)
+        return n
@@ -0,0 +1,155 @@
+# rwlock.py Reader-writer lock and reentrant lock
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Both classes queue waiting tasks directly on the scheduler's TaskQueue in the
+# same way as asyncio.Lock, so waiting involves no Event or other allocation.
+
+from asyncio import core
+
+
+# Any number of readers may hold the lock concurrently; a writer has exclusive
+# access. Writers have preference: once a writer is waiting new readers queue
+# behind it, so a stream of readers cannot starve writers.
+class RWLock:
+    def __init__(self):
+        self._readers = 0  # Number of tasks holding a read lock
+        # 0: no writer, 1: write locked, <Task>: this writer is scheduled to acquire
+        self._writer = 0
+        self._rq = core.TaskQueue()  # Waiting readers
+        self._wq = core.TaskQueue()  # Waiting writers
+        self.reader = _Reader(self)  # Allow async with lock.reader:
+        self.writer = _Writer(self)
+
+    def readers(self):  # Number of readers holding the lock
+        return self._readers
+
+    def locked(self):  # True if write locked
+        return self._writer == 1
+
+    def _wake_readers(self):
+        while self._rq.peek():
+            core._task_queue.push(self._rq.pop())
+
+    # async
+    def acquire_read(self):
+        while self._writer or self._wq.peek():
+            self._rq.push(core.cur_task)
+            # Set calling task's data to the queue so it can be removed if needed
+            core.cur_task.data = self._rq
+            yield  # Woken readers re-check: a writer may have arrived meanwhile
+        self._readers += 1
+        return True
+
+    def release_read(self):
+        if not self._readers:
+            raise RuntimeError("RWLock not read locked")
+        self._readers -= 1
+        if not self._readers:
+            if self._wq.peek():  # Hand over to the first waiting writer
+                self._writer = self._wq.pop()
+                core._task_queue.push(self._writer)
+            else:
+                self._wake_readers()
+
+    # async
+    def acquire_write(self):
+        if self._writer or self._readers:
+            self._wq.push(core.cur_task)
+            core.cur_task.data = self._wq
+            try:
+                yield
+            except core.CancelledError as er:
+                if self._writer == core.cur_task:
+                    # Cancelled while pending on resume, hand over to the next task
+                    self._writer = 1
+                    self.release_write()
+                elif not (self._writer or self._wq.peek()):
+                    self._wake_readers()  # Readers were only queued behind this writer
+                raise er
+        self._writer = 1
+        return True
+
+    def release_write(self):
+        if self._writer != 1:
+            raise RuntimeError("RWLock not write locked")
+        if self._wq.peek():
+            self._writer = self._wq.pop()
+            core._task_queue.push(self._writer)
+        else:
+            self._writer = 0
+            self._wake_readers()
+
+
+class _Reader:
+    def __init__(self, lock):
+        self._lock = lock
+
+    async def __aenter__(self):
+        return await self._lock.acquire_read()
+
+    async def __aexit__(self, *_):
+        self._lock.release_read()
+
+
+class _Writer:
+    def __init__(self, lock):
+        self._lock = lock
+
+    async def __aenter__(self):
+        return await self._lock.acquire_write()
+
+    async def __aexit__(self, *_):
+        self._lock.release_write()
+
+
+# A lock which may be acquired repeatedly by the task which holds it. It is
+# released when release() has been called once for each acquire().
+class RLock:
+    def __init__(self):
+        self._owner = None  # Task holding the lock, or scheduled to acquire it
+        self._count = 0
+        self._waiting = core.TaskQueue()
+
+    def locked(self):
+        return self._owner is not None
+
+    def _next(self):  # Hand over to the next waiting task, if any
+        if self._waiting.peek():
+            self._owner = self._waiting.pop()
+            core._task_queue.push(self._owner)
+        else:
+            self._owner = None
+
+    # async
+    def acquire(self):
+        t = core.cur_task
+        if self._owner is t:  # Reentrant acquire
+            self._count += 1
+            return True
+        if self._owner is not None:
+            self._waiting.push(t)
+            t.data = self._waiting
+            try:
+                yield
+            except core.CancelledError as er:
+                if self._owner is t:  # Cancelled while pending on resume
+                    self._next()
+                raise er
+        self._owner = t
+        self._count = 1
+        return True
+
+    def release(self):
+        if self._owner is not core.cur_task or not self._count:
+            raise RuntimeError("RLock not acquired by this task")
+        self._count -= 1
+        if not self._count:
+            self._next()
+
+    async def __aenter__(self):
+        return await self.acquire()
+
+    async def __aexit__(self, *_):
+        self.release()
@@ -3,14 +3,15 @@
 # Copyright (c) 2018-2020 Peter Hinch
 # Released under the MIT License (MIT) - see LICENSE file
 
-import asyncio
+from .waitq import WaitQueue
 
 # A Semaphore is typically used to limit the number of coros running a
 # particular piece of code at once. The number is defined in the constructor.
+# Waiting tasks acquire in FIFO order; a release wakes only the first of them.
 class Semaphore:
     def __init__(self, value=1):
         self._count = value
-        self._event = asyncio.Event()
+        self._waiting = WaitQueue()
 
     async def __aenter__(self):
         await self.acquire()
@@ -18,20 +19,18 @@ class Semaphore:
 
     async def __aexit__(self, *args):
         self.release()
-        await asyncio.sleep(0)
 
     async def acquire(self):
-        self._event.clear()
-        while self._count == 0:  # Multiple tasks may be waiting for
-            await self._event.wait()  # a release
-            self._event.clear()
-            # When we yield, another task may succeed. In this case
-            await asyncio.sleep(0)  # the loop repeats
+        if self._waiting.waiting() or self._count == 0:
+            # Queue behind any waiting tasks until a release
+            await self._waiting.wait()
         self._count -= 1
+        if self._count:
+            self._waiting.wake()  # Further releases are pending
 
     def release(self):
-        self._event.set()
         self._count += 1
+        self._waiting.wake()
 
 
 class BoundedSemaphore(Semaphore):
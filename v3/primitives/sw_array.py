@@ -1,20 +1,43 @@
 # sw_array.py A crosspoint array of pushbuttons
 
-# Copyright (c) 2023 Peter Hinch
+# Copyright (c) 2023-2026 Peter Hinch
 # Released under the MIT License (MIT) - see LICENSE file
 
 import asyncio
+from array import array
 from . import RingbufQueue
-from time import ticks_ms, ticks_diff
+from time import ticks_ms, ticks_diff, ticks_add
+
+# Scan policy: the matrix is scanned continuously for active_ms after a change
+# of state, then every idle_ms. If irq is True and no key is pressed, scanning
+# stops: all rows are asserted and the scan task waits on a column pin IRQ.
+async def _wait_press(rowpins, colpins, tsf):
+    for opin in rowpins:
+        opin(0)  # A key press will pull its column low
+    for ipin in colpins:
+        ipin.irq(lambda _: tsf.set(), trigger=ipin.IRQ_FALLING)
+    try:
+        tsf.clear()
+        if all(ipin() for ipin in colpins):  # No key was pressed before IRQ was armed
+            await tsf.wait()
+    finally:
+        for ipin in colpins:
+            ipin.irq(None)
+        for opin in rowpins:
+            opin(1)
+
 
 # A crosspoint array of pushbuttons
 # Tuples/lists of pins. Rows are OUT, cols are IN
 class Keyboard(RingbufQueue):
-    def __init__(self, rowpins, colpins, *, bufsize=10, db_delay=50):
+    def __init__(self, rowpins, colpins, *, bufsize=10, db_delay=50, active_ms=1000, idle_ms=20, irq=False):
         super().__init__(bytearray(bufsize) if isinstance(bufsize, int) else bufsize)
         self.rowpins = rowpins
         self.colpins = colpins
         self._state = 0  # State of all keys as bitmap
+        self._active_ms = active_ms
+        self._idle_ms = idle_ms
+        self._tsf = asyncio.ThreadSafeFlag() if irq else None
         for opin in self.rowpins:  # Initialise output pins
             opin(1)
         self._run = asyncio.create_task(self.scan(len(rowpins) * len(colpins), db_delay))
@@ -23,6 +46,7 @@ class Keyboard(RingbufQueue):
         return bool(self._state & (1 << scan_code))
 
     async def scan(self, nkeys, db_delay):
+        tact = ticks_ms()  # Time of last change
         while True:
             cur = 0  # Current bitmap of logical key states
             for opin in self.rowpins:
@@ -41,7 +65,16 @@ class Keyboard(RingbufQueue):
                     pressed >>= 1
             changed = cur ^ self._state  # Any new press or release
             self._state = cur
-            await asyncio.sleep_ms(db_delay if changed else 0)  # Wait out bounce
+            if changed:
+                tact = ticks_ms()
+                await asyncio.sleep_ms(db_delay)  # Wait out bounce
+            elif ticks_diff(ticks_ms(), tact) < self._active_ms:
+                await asyncio.sleep_ms(0)
+            elif self._tsf is not None and not cur:
+                await _wait_press(self.rowpins, self.colpins, self._tsf)
+                tact = ticks_ms()
+            else:
+                await asyncio.sleep_ms(self._idle_ms)
 
     def deinit(self):
         self._run.cancel()
@@ -53,26 +86,41 @@ LONG = const(4)
 DOUBLE = const(8)
 SUPPRESS = const(16)  # Disambiguate: see docs.
 
+_IDLE = const(0)  # Key states when detecting long or double presses
+_PRESSED = const(1)  # Awaiting release or long press
+_RELEASED = const(2)  # Awaiting second press or double click timeout
+_FINISH = const(3)  # Awaiting release, then report OPEN
+
 # Entries in queue are (scan_code, event) where event is an OR of above constants.
 # rowpins/colpins are tuples/lists of pins. Rows are OUT, cols are IN.
 # cfg is a logical OR of above constants. If a bit is 0 that state will never be reported.
+# Long and double presses are detected by the scan task: each key has a state
+# and a timestamp in a table. Keys not in the idle state are flagged in a
+# bitmap and are advanced on each scan. The scan task sleeps no longer than the
+# next timeout.
 class SwArray(RingbufQueue):
     debounce_ms = 50  # Attributes can be varied by user
     long_press_ms = 1000
     double_click_ms = 400
 
-    def __init__(self, rowpins, colpins, cfg, *, bufsize=10):
+    def __init__(self, rowpins, colpins, cfg, *, bufsize=10, active_ms=1000, idle_ms=20, irq=False):
         super().__init__(bufsize)
         self._rowpins = rowpins
         self._colpins = colpins
         self._cfg = cfg
+        self._active_ms = active_ms
+        self._idle_ms = idle_ms
+        self._tsf = asyncio.ThreadSafeFlag() if irq else None
         self._state = 0  # State of all buttons as bitmap
-        self._flags = 0  # Busy bitmap
+        self._active = 0  # Bitmap of keys not in _IDLE state
+        nkeys = len(rowpins) * len(colpins)
+        self._kstate = bytearray(nkeys)  # State of each key
+        self._kts = array("i", [0] * nkeys)  # Time of key press
         self._basic = not bool(cfg & (SUPPRESS | LONG | DOUBLE))  # Basic mode
         self._suppress = bool(cfg & SUPPRESS)
         for opin in self._rowpins:  # Initialise output pins
             opin(1)  # open circuit
-        self._run = asyncio.create_task(self._scan(len(rowpins) * len(colpins)))
+        self._run = asyncio.create_task(self._scan(nkeys))
 
     def __getitem__(self, scan_code):
         return bool(self._state & (1 << scan_code))
@@ -84,53 +132,51 @@ class SwArray(RingbufQueue):
             except IndexError:  # q full. Overwrite oldest
                 pass
 
-    def _timeout(self, ts, condition):
-        t = SwArray.long_press_ms if condition == LONG else SwArray.double_click_ms
-        return ticks_diff(ticks_ms(), ts) > t
-
-    def _busy(self, sc, v):
-        of = self._flags  # Return prior state
-        if v:
-            self._flags |= 1 << sc
-        else:
-            self._flags &= ~(1 << sc)
-        return (of >> sc) & 1
-
-    async def _finish(self, sc):  # Tidy up. If necessary await a contact open
-        while self[sc]:
-            await asyncio.sleep_ms(0)
-        self._put(sc, OPEN)
-        self._busy(sc, False)
-
     def keymap(self):  # Return a bitmap of debounced state of all buttons/switches
         return self._state
 
-    # Handle long, double. Switch has closed.
-    async def _defer(self, sc):
-        # Wait for contact closure to be registered: let calling loop complete
-        await asyncio.sleep_ms(0)
-        ts = ticks_ms()
-        if not self._suppress:
-            self._put(sc, CLOSE)
-        while self[sc]:  # Pressed
-            await asyncio.sleep_ms(0)
-            if self._timeout(ts, LONG):
-                self._put(sc, LONG)
-                await self._finish(sc)
-                return
-        if not self._suppress:
-            self._put(sc, OPEN)
-        while not self[sc]:
-            await asyncio.sleep_ms(0)
-            if self._timeout(ts, DOUBLE):  # No second closure
-                self._put(sc, CLOSE)  # Single press. Report CLOSE
-                await self._finish(sc)  # then OPEN
-                return
-        self._put(sc, DOUBLE)
-        await self._finish(sc)
+    # Advance the state of keys handling long, double. Return ms to next timeout
+    # or -1 if none is pending.
+    def _advance(self, now):
+        dt = -1
+        ks = self._kstate
+        active = self._active
+        sc = 0
+        while active:
+            if active & 1:
+                st = ks[sc]
+                pressed = self[sc]
+                if st == _PRESSED:
+                    if not pressed:
+                        if not self._suppress:
+                            self._put(sc, OPEN)
+                        st = _RELEASED
+                    elif ticks_diff(now, self._kts[sc]) > SwArray.long_press_ms:
+                        self._put(sc, LONG)
+                        st = _FINISH
+                elif st == _RELEASED:
+                    if pressed:
+                        self._put(sc, DOUBLE)
+                        st = _FINISH
+                    elif ticks_diff(now, self._kts[sc]) > SwArray.double_click_ms:  # No second closure
+                        self._put(sc, CLOSE)  # Single press. Report CLOSE
+                        st = _FINISH  # then OPEN
+                if st == _FINISH and not pressed:
+                    self._put(sc, OPEN)
+                    st = _IDLE
+                    self._active &= ~(1 << sc)
+                ks[sc] = st
+                if st == _PRESSED or st == _RELEASED:  # Timeout pending
+                    t = SwArray.long_press_ms if st == _PRESSED else SwArray.double_click_ms
+                    t = max(ticks_diff(ticks_add(self._kts[sc], t + 1), now), 0)
+                    dt = t if dt < 0 else min(dt, t)
+            active >>= 1
+            sc += 1
+        return dt
 
     async def _scan(self, nkeys):
         db_delay = SwArray.debounce_ms
+        tact = ticks_ms()  # Time of last change
         while True:
             cur = 0  # Current bitmap of logical button states (1 == pressed)
             for opin in self._rowpins:
@@ -139,20 +185,36 @@ class SwArray(RingbufQueue):
                     cur <<= 1
                     cur |= ipin() ^ 1  # Convert physical to logical
                 opin(1)
+            now = ticks_ms()
             curb = cur  # Copy current bitmap
             if changed := (cur ^ self._state):  # 1's are newly canged button(s)
                 for sc in range(nkeys):
                     if changed & 1:  # Current button has changed state
                         if self._basic:  # No timed behaviour
                             self._put(sc, CLOSE if cur & 1 else OPEN)
-                        elif cur & 1:  # Closed
-                            if not self._busy(sc, True):  # Currently not busy
-                                asyncio.create_task(self._defer(sc))  # Q is handled asynchronously
+                        elif cur & 1 and not self._kstate[sc]:  # Closed and idle
+                            self._kstate[sc] = _PRESSED
+                            self._kts[sc] = now
+                            self._active |= 1 << sc
+                            if not self._suppress:
+                                self._put(sc, CLOSE)
                     changed >>= 1
                     cur >>= 1
             changed = curb ^ self._state  # Any new press or release
             self._state = curb
-            await asyncio.sleep_ms(db_delay if changed else 0)  # Wait out bounce
+            t = self._advance(now) if self._active else -1  # Time to next timeout
+            if changed:
+                tact = now
+                dt = db_delay  # Wait out bounce
+            elif ticks_diff(now, tact) < self._active_ms:
+                dt = 0
+            elif self._tsf is not None and not curb and not self._active:
+                await _wait_press(self._rowpins, self._colpins, self._tsf)
+                tact = ticks_ms()
+                continue
+            else:
+                dt = self._idle_ms
+            await asyncio.sleep_ms(dt if t < 0 else min(dt, t))
 
     def deinit(self):
         self._run.cancel()
@@ -1,22 +1,30 @@
 # switch.py
 
-# Copyright (c) 2018-2022 Peter Hinch
+# Copyright (c) 2018-2026 Peter Hinch
 # Released under the MIT License (MIT) - see LICENSE file
 
 import asyncio
 import time
-from . import launch
+from . import launch, _irq_poll
 
 
 class Switch:
     debounce_ms = 50
 
-    def __init__(self, pin):
+    def __init__(self, pin, group=None, irq=False):
         self.pin = pin  # Should be initialised for input with pullup
         self._open_func = False
         self._close_func = False
         self.switchstate = self.pin.value()  # Get initial state
-        self._run = asyncio.create_task(self.switchcheck())  # Thread runs forever
+        self._group = group
+        if group is None:  # Task runs forever
+            if irq:  # Wake on pin edges
+                self._run = asyncio.create_task(_irq_poll(pin, pin.value, self._check, Switch.debounce_ms))
+            else:
+                self._run = asyncio.create_task(self.switchcheck())
+        else:  # Group task polls the pin
+            self._gcb = self._check
+            group.add(pin, 0, self._gcb)
 
     def open_func(self, func, args=()):
         if func is None:
@@ -34,18 +42,24 @@ class Switch:
     def __call__(self):
         return self.switchstate
 
+    def _check(self, state):
+        if state != self.switchstate:
+            # State has changed: act on it now.
+            self.switchstate = state
+            if state == 0 and self._close_func:
+                launch(self._close_func, self._close_args)
+            elif state == 1 and self._open_func:
+                launch(self._open_func, self._open_args)
+            return True
+
     async def switchcheck(self):
         while True:
-            state = self.pin.value()
-            if state != self.switchstate:
-                # State has changed: act on it now.
-                self.switchstate = state
-                if state == 0 and self._close_func:
-                    launch(self._close_func, self._close_args)
-                elif state == 1 and self._open_func:
-                    launch(self._open_func, self._open_args)
+            self._check(self.pin.value())
             # Ignore further state changes until switch has settled
             await asyncio.sleep_ms(Switch.debounce_ms)
 
     def deinit(self):
-        self._run.cancel()
+        if self._group is None:
+            self._run.cancel()
+        else:
+            self._group.remove(self._gcb)
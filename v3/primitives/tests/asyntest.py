@@ -18,6 +18,7 @@ import sys
 unix = "linux" in sys.implementation._machine
 
 from primitives import Barrier, Semaphore, BoundedSemaphore, Condition, Queue, RingbufQueue
+from primitives import PriorityQueue, DeadlineQueue
 
 try:
     from threadsafe import Message
@@ -38,6 +39,8 @@ test(7)  Test the Condition class.
 test(8)  Test the Queue class.
 test(9)  Test the RingbufQueue class.
 test(10) Test the Queue task_done/join behavior.
+test(11) Test the Queue batch methods.
+test(12) Test the PriorityQueue and DeadlineQueue classes.
 """
     print("\x1b[32m")
     print(st)
@@ -502,13 +505,13 @@ cond02 3 Awaiting notification.
 cond02 4 Awaiting notification.
 cond02 5 Awaiting notification.
 cond02 6 Awaiting notification.
-cond02 5 triggered. tim = 1
-cond02 6 triggered. tim = 1
+cond02 0 triggered. tim = 1
+cond02 1 triggered. tim = 1
+cond02 2 triggered. tim = 3
 cond02 3 triggered. tim = 3
-cond02 4 triggered. tim = 3
-cond02 1 triggered. tim = 5
-cond02 2 triggered. tim = 5
-cond02 0 triggered. tim = 7
+cond02 4 triggered. tim = 5
+cond02 5 triggered. tim = 5
+cond02 6 triggered. tim = 7
 cond04 99 Awaiting notification and predicate.
 cond04 99 triggered. tim = 9
 Done.
@@ -782,6 +785,77 @@ test DONE
     asyncio.run(q_task_done_join_go())
 
 
+# ************ Queue batch test ************
+async def q_batch_consumer(q, total):
+    n = 0
+    while n < total:
+        batch = await q.get_many(8)  # Up to 8 items per wakeup
+        print("consumer", "got", batch)
+        n += len(batch)
+        await asyncio.sleep_ms(100)
+
+
+async def q_batch_go():
+    q = Queue(20)
+    await q.put_many(range(5))
+    print("test", "get_nowait_many", q.get_nowait_many(3), q.get_nowait_many(3), q.get_nowait_many(3))
+    t = asyncio.create_task(q_batch_consumer(q, 30))
+    await q.put_many(range(30))  # Pauses while the queue is full
+    print("test", "put_many complete")
+    await t
+    print("test", "DONE")
+
+
+def q_batch_test():
+    printexp(
+        """Test Queue batch methods
+test get_nowait_many [0, 1, 2] [3, 4] []
+consumer got [0, 1, 2, 3, 4, 5, 6, 7]
+consumer got [8, 9, 10, 11, 12, 13, 14, 15]
+test put_many complete
+consumer got [16, 17, 18, 19, 20, 21, 22, 23]
+consumer got [24, 25, 26, 27, 28, 29]
+test DONE
+""",
+        1,
+    )
+    asyncio.run(q_batch_go())
+
+
+# ************ PriorityQueue and DeadlineQueue test ************
+async def pq_go():
+    q = PriorityQueue(10)
+    for n, pri in enumerate((2, 0, 2, 1, 0)):
+        q.put_nowait("item {} pri {}".format(n, pri), pri)
+    while not q.empty():
+        print(q.get_nowait())
+    q = DeadlineQueue()
+    q.put_nowait("slow", 1000)
+    q.put_nowait("fast", 100)
+    q.put_nowait("medium", 500)
+    await asyncio.sleep_ms(200)  # "fast" expires
+    async for item in q:
+        print("got", item, "expired", q.expired)
+        if q.empty():
+            break
+
+
+def pq_test():
+    printexp(
+        """Test PriorityQueue and DeadlineQueue
+item 1 pri 0
+item 4 pri 0
+item 3 pri 1
+item 0 pri 2
+item 2 pri 2
+got medium expired 1
+got slow expired 1
+""",
+        1,
+    )
+    asyncio.run(pq_go())
+
+
 # ************ ************
 def test(n):
     try:
@@ -805,6 +879,10 @@ def test(n):
             rbq_test()  # Test the RingbufQueue class.
         elif n == 10:
             q_task_done_join_test()  # Test the Queue task_done/join behavior.
+        elif n == 11:
+            q_batch_test()  # Test the Queue batch methods.
+        elif n == 12:
+            pq_test()  # Test PriorityQueue and DeadlineQueue.
     except KeyboardInterrupt:
         print("Interrupted")
     finally:
@@ -0,0 +1,97 @@
+# block_adc_test.py Test BlockADC with a simulated ADC and timer
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Runs on any target including the Unix build.
+# Usage:
+# import primitives.tests.block_adc_test
+
+# The simulated ADC produces a noisy sawtooth. The simulated timer calls its
+# callback from a task at the mean rate requested. ADC reads are counted to
+# compare the cost of AADC, which reads the ADC on every scheduler pass, with
+# that of BlockADC.
+
+import asyncio
+from random import getrandbits
+from time import ticks_ms, ticks_diff
+from primitives import AADC
+from primitives.aadc import BlockADC, DECIMATE, MEAN, MIN, MAX
+
+FREQ = 1000  # Sample rate (Hz)
+
+
+class ADC:  # Stub: sawtooth of period 1000 samples plus noise
+    def __init__(self, noise=2000):
+        self._n = 0
+        self._noise = noise
+        self.reads = 0
+
+    def read_u16(self):
+        self.reads += 1
+        self._n = (self._n + 1) % 1000
+        v = self._n * 60 + getrandbits(12) * self._noise // 4096
+        return min(v, 65535)
+
+
+class Timer:  # Stub: run the callback at a mean rate of freq Hz
+    PERIODIC = 1
+
+    def init(self, freq, mode, callback):
+        self._task = asyncio.create_task(self._run(freq, callback))
+
+    async def _run(self, freq, callback):
+        t = ticks_ms()
+        n = 0
+        while True:
+            await asyncio.sleep_ms(10)
+            while n < ticks_diff(ticks_ms(), t) * freq // 1000:
+                callback(self)
+                n += 1
+
+    def deinit(self):
+        self._task.cancel()
+
+
+async def spin(ms):  # Keep the scheduler busy
+    t = ticks_ms()
+    while ticks_diff(ticks_ms(), t) < ms:
+        await asyncio.sleep_ms(0)
+
+
+async def main():
+    # Filter modes. Blocks of 100 samples are reduced to 10 values.
+    for mode, name in ((DECIMATE, "Decimate"), (MEAN, "Mean"), (MIN, "Min"), (MAX, "Max")):
+        badc = BlockADC(ADC(), Timer(), FREQ, nsamples=100, factor=10, mode=mode)
+        print("{:8s}".format(name), list(await badc.block()))
+        badc.deinit()
+
+    # Threshold detection: wait for the filtered value to reach 40000
+    adc = ADC()
+    badc = BlockADC(adc, Timer(), FREQ, nsamples=100, factor=10, mode=MEAN)
+    badc.sense(normal=False)
+    t = ticks_ms()
+    v = await badc(40000, 65535)
+    print("Threshold reached {} after {}ms, {} blocks lost".format(v, ticks_diff(ticks_ms(), t), badc.overruns))
+    badc.deinit()
+
+    # Cost of monitoring for one second while other tasks keep the scheduler busy
+    async def monitor(obj):
+        obj.sense(normal=False)
+        await obj(65535, 65535)  # Never satisfied
+
+    for cls in (AADC, BlockADC):
+        adc = ADC()
+        obj = AADC(adc) if cls is AADC else BlockADC(adc, Timer(), FREQ)
+        task = asyncio.create_task(monitor(obj))
+        await spin(1000)
+        task.cancel()
+        if cls is BlockADC:
+            obj.deinit()
+        print("{:8s} {:6d} ADC reads/s".format(cls.__name__, adc.reads))
+
+
+try:
+    asyncio.run(main())
+finally:
+    asyncio.new_event_loop()
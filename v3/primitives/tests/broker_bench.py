@@ -0,0 +1,55 @@
+# broker_bench.py Measure the Broker publish rate
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Usage:
+# import primitives.tests.broker_bench
+
+# 200 subscriptions: 180 exact topics, 16 MQTT style wildcards and 4 RegExp
+# instances. Messages are published round-robin to 20 topics, each of which
+# triggers a function agent, then to 200 topics: more than Broker.CacheSize, so
+# that the cache is continually evicting.
+
+from time import ticks_ms, ticks_diff
+from primitives import Broker, RegExp
+
+NPUBS = 20_000
+count = 0
+
+
+def agent(topic, message, n):
+    global count
+    count += 1
+
+
+def run(broker, name, ntopics=20):
+    global count
+    count = 0
+    topics = ["sensor/{}/temp".format(n) for n in range(ntopics)]
+    t = ticks_ms()
+    for n in range(NPUBS):
+        broker.publish(topics[n % ntopics], n)
+    dt = ticks_diff(ticks_ms(), t)
+    name = "{} ({} topics)".format(name, ntopics)
+    print("{:40s} {:6d} publish/s {} deliveries".format(name, NPUBS * 1000 // max(dt, 1), count))
+
+
+def main():
+    b = Broker()
+    for n in range(180):
+        b.subscribe("sensor/{}/{}".format(n, "temp" if n < 10 else "humidity"), agent, n)
+    run(b, "Exact topics")
+    run(b, "Exact topics", 200)
+    for n in range(16):
+        b.subscribe("sensor/+/{}".format("temp" if n == 0 else n), agent, 200 + n)
+    run(b, "Exact and wildcard topics")
+    run(b, "Exact and wildcard topics", 200)
+    for n in range(4):
+        b.subscribe(RegExp("sensor/{}.*".format(n)), agent, 300 + n)
+    run(b, "Exact, wildcard and RegExp")
+    run(b, "Exact, wildcard and RegExp", 200)
+    print("Cached topics:", len(b._cache), "CacheSize:", Broker.CacheSize)
+
+
+main()
@@ -119,6 +119,50 @@ async def main():
     except ValueError:
         print("Test PASS")
     print()
+    print("*** Test agent publishing a retained message on subscription ***")
+
+    def republish(topic, message):
+        broker.publish("ret_copy", message, retain=True)
+
+    broker.publish("ret_topic", 42, retain=True)
+    broker.subscribe("ret_topic", republish)  # Replay runs republish
+    print("Test PASS" if broker.get_retained("ret_copy") == 42 else "Test FAIL")
+    broker.unsubscribe("ret_topic", republish)
+    print()
+    print("*** Test agent unsubscribing itself ***")
+    calls = []
+
+    def once(topic, message):
+        calls.append(message)
+        broker.unsubscribe(topic, once)
+
+    broker.subscribe("once_topic", once)
+    broker.publish("once_topic", 1)
+    broker.publish("once_topic", 2)
+    print("Test PASS" if calls == [1] else "Test FAIL")
+    print()
+    print("*** Test agent raising an exception in publish_threadsafe ***")
+    errors = []
+    loop = asyncio.get_event_loop()
+    loop.set_exception_handler(lambda loop, ctx: errors.append(ctx["exception"]))
+
+    def fragile(topic, message):
+        if message is None:
+            raise ValueError("Bad message")
+        calls.append(message)
+
+    calls.clear()
+    broker.init_threadsafe()
+    broker.subscribe("ts_topic", fragile)
+    broker.publish_threadsafe("ts_topic")
+    await asyncio.sleep_ms(50)
+    broker.publish_threadsafe("ts_topic", 3)  # Drain task still runs
+    await asyncio.sleep_ms(50)
+    loop.set_exception_handler(None)
+    broker.unsubscribe("ts_topic", fragile)
+    ok = calls == [3] and len(errors) == 1 and isinstance(errors[0], ValueError)
+    print("Test PASS" if ok else "Test FAIL")
+    print()
     print("*** Test wildcard subscribe ***")
     broker.subscribe(RegExp(".*_topic"), func)
     broker.publish("FAIL", func)  # No match
@@ -0,0 +1,96 @@
+# condition_bench.py Measure Condition notify/wait cycles and check ordering
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Usage:
+# import primitives.tests.condition_bench
+
+# NTASKS consumers wait on a Condition. A producer notifies one task at a time
+# and yields so that the woken task can run and wait again. Cycles per second,
+# heap use per cycle (MicroPython only) and the order in which consumers are
+# woken are reported. For comparison the same test is run on a Condition using
+# the previous design with an Event per wait. That notifies the most recent
+# waiter, so a task which waits again as soon as it is woken starves the rest.
+
+import asyncio
+import gc
+from time import ticks_ms, ticks_diff
+from primitives import Condition
+
+NTASKS = 20
+NCYCLES = 5000
+
+
+class EventCondition(Condition):  # Previous design: allocates an Event per wait
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def notify(self, n=1):
+        for _ in range(min(n, len(self.events))):
+            self.events.pop().set()
+
+    def notify_all(self):
+        self.notify(len(self.events))
+
+    async def wait(self):
+        ev = asyncio.Event()
+        self.events.append(ev)
+        self.lock.release()
+        await ev.wait()
+        await self.lock.acquire()
+        assert ev not in self.events, "condition wait assertion fail"
+        return True
+
+
+stop = False
+
+
+async def consumer(cond, order, n):
+    while not stop:
+        with await cond:
+            await cond.wait()
+            order.append(n)
+
+
+async def run(cls):
+    global stop
+    stop = False
+    cond = cls()
+    order = []
+    tasks = [asyncio.create_task(consumer(cond, order, n)) for n in range(NTASKS)]
+    await asyncio.sleep_ms(0)  # All consumers are waiting
+    gc.collect()
+    try:
+        m = gc.mem_alloc()
+    except AttributeError:  # CPython
+        m = None
+    t = ticks_ms()
+    for _ in range(NCYCLES):
+        with await cond:
+            cond.notify()
+        await asyncio.sleep_ms(0)  # Woken task runs and waits again
+    dt = ticks_diff(ticks_ms(), t)
+    mem = "" if m is None else "{:4d} bytes/cycle".format((gc.mem_alloc() - m) // NCYCLES)
+    fifo = order == [n % NTASKS for n in range(NCYCLES)]
+    woken = len(set(order))
+    stop = True
+    with await cond:
+        cond.notify_all()
+    await asyncio.gather(*tasks)
+    rate = NCYCLES * 1000 // max(dt, 1)
+    fifo = "FIFO" if fifo else "not FIFO"
+    print("{:14s} {:6d} cycles/s {} {:2d} of {} tasks woken {}".format(cls.__name__, rate, mem, woken, NTASKS, fifo))
+
+
+async def main():
+    print("{} waiting tasks, {} cycles.".format(NTASKS, NCYCLES))
+    await run(Condition)
+    await run(EventCondition)
+
+
+try:
+    asyncio.run(main())
+finally:
+    asyncio.new_event_loop()
@@ -0,0 +1,47 @@
+# counting.py Count task wakeups by wrapping the scheduler's run queue
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Shared by the tests which measure wakeups. Usage:
+# cq = CountingQueue(tasks)  # Count pushes of these tasks. None: count all tasks.
+# cq.install()
+# ...  # Measured code
+# cq.uninstall()
+# print(cq.count)
+# While installed, core._task_queue is not the event loop's own queue. A Delay_ms
+# created then would take the loop to be a new one and start a second service
+# task. Create objects using Delay_ms (Pushbutton, EButton...) before install().
+
+from asyncio import core
+
+
+class CountingQueue:
+    def __init__(self, tasks=None):
+        self._tq = None
+        self._tasks = tasks
+        self.count = 0
+
+    def install(self):
+        self._tq = core._task_queue
+        core._task_queue = self
+
+    def uninstall(self):
+        core._task_queue = self._tq
+
+    def push(self, t, key=None):
+        if self._tasks is None or t in self._tasks:
+            self.count += 1
+        if key is None:
+            self._tq.push(t)
+        else:
+            self._tq.push(t, key)
+
+    def pop(self):
+        return self._tq.pop()
+
+    def peek(self):
+        return self._tq.peek()
+
+    def remove(self, t):
+        self._tq.remove(t)
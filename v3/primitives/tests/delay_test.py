@@ -1,6 +1,6 @@
 # delay_test.py Tests for Delay_ms class
 
-# Copyright (c) 2020 Peter Hinch
+# Copyright (c) 2020-2026 Peter Hinch
 # Released under the MIT License (MIT) - see LICENSE file
 
 import asyncio
@@ -213,6 +213,63 @@ Done
     print("Done")
 
 
+async def many_test():  # Many instances share one timer service
+    s = """
+Trigger 40 delays
+Callbacks ran in order of end time
+Stopped delays did not run
+Done
+    """
+    printexp(s, 2)
+
+    done = []
+    ds = [Delay_ms(done.append, (n,), duration=500 + 20 * n) for n in range(40)]
+    print("Trigger 40 delays")
+    for d in reversed(ds):
+        d.trigger()
+    for d in ds[::2]:
+        d.stop()
+    await asyncio.sleep(2)
+    if done == list(range(1, 40, 2)):
+        print("Callbacks ran in order of end time")
+    if not any(d() for d in ds) and not any(n in done for n in range(0, 40, 2)):
+        print("Stopped delays did not run")
+    for d in ds:
+        d.deinit()
+    print("Done")
+
+
+async def raise_test():  # A callback which raises does not stop other instances
+    s = """
+Trigger two delays: the first callback raises
+Traceback of ZeroDivisionError
+Second delay expired
+Retriggered first delay expired
+Done
+    """
+    printexp(s, 2)
+
+    def bad():
+        1 / 0
+
+    d1 = Delay_ms(bad, duration=200)
+    d2 = Delay_ms(duration=400)
+    print("Trigger two delays: the first callback raises")
+    d1.trigger()
+    d2.trigger()
+    await asyncio.sleep_ms(600)
+    if not d2():
+        print("Second delay expired")
+    d1.callback()  # No callback
+    d1.trigger()
+    await asyncio.sleep_ms(400)
+    if not d1():
+        print("Retriggered first delay expired")
+    d1.deinit()
+    d2.deinit()
+    print("Done")
+
+
 av = """
 Run a test by issuing
 delay_test.test(n)
@@ -224,11 +281,13 @@ where n is a test number. Avaliable tests:
 3 Test delay defined by constructor arg
 4 Test triggering a Task
 5 Attempt to trigger de-initialised instance
+6 Test many instances sharing the timer service.
+7 Test a callback which raises an exception.
 \x1b[39m
 """
 print(av)
 
-tests = (isr_test, stop_test, reduce_test, ctor_test, launch_test, err_test)
+tests = (isr_test, stop_test, reduce_test, ctor_test, launch_test, err_test, many_test, raise_test)
 
 
 def test(n=0):
@@ -0,0 +1,115 @@
+# encoder_bank_test.py Compare Encoder instances with an EncoderBank
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Runs on any target including the Unix build: encoders are simulated.
+# Usage:
+# import primitives.tests.encoder_bank_test
+
+# NENC simulated encoders are driven by one task at different rates. Final
+# values are checked against those expected and scheduler wakeups are counted
+# for Encoder instances and for an EncoderBank tracking the same encoders.
+
+import asyncio
+from primitives.encoder import Encoder, EncoderBank
+from .counting import CountingQueue
+
+NENC = 12
+DIV = 4
+RUNTIME = 1000  # ms
+
+
+class Pin:  # Stub: an input with interrupts on both edges
+    IRQ_FALLING = 1
+    IRQ_RISING = 2
+
+    def __init__(self):
+        self._v = 0
+        self._isr = None
+
+    def __call__(self, v=None):
+        if v is None:
+            return self._v
+        if v != self._v:
+            self._v = v
+            if self._isr is not None:
+                self._isr(self)
+
+    def irq(self, handler=None, trigger=3, hard=False):
+        self._isr = handler
+
+
+class Quad:  # Simulated encoder: Gray code on two pins
+    SEQ = ((0, 0), (1, 0), (1, 1), (0, 1))
+
+    def __init__(self):
+        self.x = Pin()
+        self.y = Pin()
+        self._n = 0
+
+    def step(self, d):
+        self._n = (self._n + d) % 4
+        x, y = self.SEQ[self._n]
+        self.x(x)
+        self.y(y)
+
+
+async def drive(quads):  # Encoder n moves n + 1 clicks each way at one step per 10ms
+    for d in (1, -1, 1):
+        for _ in range(DIV * NENC):
+            for n, q in enumerate(quads):
+                if _ < DIV * (n + 1):
+                    q.step(d)
+            await asyncio.sleep_ms(10)
+        await asyncio.sleep_ms(200)
+
+
+async def measure(bank):
+    quads = [Quad() for _ in range(NENC)]
+    vmax = NENC // 2
+    if bank:
+        obj = EncoderBank(period=50)
+        for q in quads:
+            obj.add(q.x, q.y, div=DIV, vmax=vmax)
+    else:
+        obj = [Encoder(q.x, q.y, div=DIV, vmax=vmax, delay=50) for q in quads]
+    peak = [0] * NENC
+
+    async def consume():  # Record peak velocities
+        async for changed in obj:
+            for n in range(NENC):
+                if changed & (1 << n):
+                    peak[n] = max(peak[n], obj.velocity(n))
+
+    if bank:
+        task = asyncio.create_task(consume())
+    cq = CountingQueue()
+    cq.install()
+    try:
+        await drive(quads)
+        await asyncio.sleep_ms(RUNTIME)
+    finally:
+        cq.uninstall()
+    if bank:
+        task.cancel()
+        values = [obj.value(n) for n in range(NENC)]
+        print("Peak velocities", peak)
+    else:
+        values = [enc.value() for enc in obj]
+    expected = [min(n + 1, vmax) for n in range(NENC)]
+    return cq.count, values == expected
+
+
+async def main():
+    print("{} encoders.".format(NENC))
+    count, ok = await measure(False)
+    print("Encoder     {:5d} wakeups {}".format(count, "Pass" if ok else "Fail"))
+    count, ok = await measure(True)
+    print("EncoderBank {:5d} wakeups {}".format(count, "Pass" if ok else "Fail"))
+
+
+try:
+    asyncio.run(main())
+finally:
+    asyncio.new_event_loop()
@@ -0,0 +1,74 @@
+# import_bench.py Report import time and heap use of lazily loaded symbols
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Usage:
+# import primitives.tests.import_bench
+
+# Each module of the primitives and threadsafe packages is loaded in isolation
+# by accessing its first symbol: the module and any modules it imports are then
+# unloaded so that each figure includes its dependencies. Heap use is measured
+# after a garbage collection so it is the RAM retained by the import. Compare
+# figures for modules loaded from the filesystem with those frozen into
+# firmware using primitives/manifest.py and threadsafe/manifest.py.
+
+import gc
+import sys
+from time import ticks_us, ticks_diff
+import primitives
+import threadsafe
+
+BUDGET_MS = None  # Set to flag modules whose import time exceeds it
+
+
+def _mem():
+    gc.collect()
+    try:
+        return gc.mem_alloc()
+    except AttributeError:  # CPython
+        return 0
+
+
+def _load(pkg, attr):  # Return (us, bytes) for loading the module defining attr
+    before = set(sys.modules)
+    m = _mem()
+    t = ticks_us()
+    try:
+        getattr(pkg, attr)
+    except (ImportError, SystemExit):  # Module is for another platform
+        dt = None
+    else:
+        dt = ticks_diff(ticks_us(), t)
+    m = _mem() - m
+    for name in set(sys.modules) - before:  # Unload
+        del sys.modules[name]
+    for p in (primitives, threadsafe):
+        for a in list(p._attrs) + [mod for mod in p._attrs.values()]:
+            if a in p.__dict__:
+                delattr(p, a)
+    return dt, m
+
+
+def run():
+    print("{:32s} {:>8s} {:>8s}".format("Module (symbols)", "us", "bytes"))
+    tt = tm = 0
+    for pkg in (primitives, threadsafe):
+        mods = {}  # Module name: symbols
+        for attr, mod in pkg._attrs.items():
+            mods.setdefault(mod, []).append(attr)
+        for mod in sorted(mods):
+            attrs = mods[mod]
+            dt, m = _load(pkg, attrs[0])
+            name = "{}.{} ({})".format(pkg.__name__, mod, len(attrs))
+            if dt is None:
+                print("{:32s} {:>8s}".format(name, "n/a"))
+                continue
+            tt += dt
+            tm += m
+            over = "" if BUDGET_MS is None or dt <= BUDGET_MS * 1000 else " Over budget"
+            print("{:32s} {:8d} {:8d}{}".format(name, dt, m, over))
+    print("{:32s} {:8d} {:8d}".format("Total", tt, tm))
+
+
+run()
@@ -0,0 +1,51 @@
+# inbox_test.py Demonstrate Inbox delivery policies and statistics
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Usage:
+# import primitives.tests.inbox_test
+
+# A producer publishes to two topics every 10ms. A consumer for each policy
+# takes 25ms to process a message, so cannot keep up.
+
+import asyncio
+from primitives import Broker, Inbox
+
+POLICIES = ("DROP_NEW", "DROP_OLD", "BLOCK", "COALESCE")
+
+
+async def consumer(inbox, got):
+    async for topic, message in inbox:
+        got.append(message)
+        await asyncio.sleep_ms(25)
+
+
+async def main():
+    broker = Broker()
+    inboxes = []
+    tasks = []
+    for n in range(len(POLICIES)):
+        inbox = Inbox(5, n, timeout_ms=50)
+        broker.subscribe("sensor/+", inbox)
+        inboxes.append((inbox, []))
+        tasks.append(asyncio.create_task(consumer(*inboxes[-1])))
+    for x in range(100):
+        broker.publish("sensor/{}".format(x & 1), x)
+        await asyncio.sleep_ms(10)
+    await asyncio.sleep_ms(500)  # Allow consumers to empty the queues
+    for t in tasks:
+        t.cancel()
+    print("Policy    delivered dropped hwm max_lag(ms) last messages")
+    for name, (inbox, got) in zip(POLICIES, inboxes):
+        print(
+            "{:9s} {:9d} {:7d} {:3d} {:11d} {}".format(
+                name, inbox.delivered, inbox.dropped, inbox.hwm, inbox.max_lag, got[-4:]
+            )
+        )
+
+
+try:
+    asyncio.run(main())
+finally:
+    asyncio.new_event_loop()
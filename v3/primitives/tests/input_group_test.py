@@ -0,0 +1,89 @@
+# input_group_test.py Compare wakeups of polled, grouped and IRQ driven inputs
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Runs on any target including the Unix build: pins are simulated.
+# Usage:
+# import primitives.tests.input_group_test
+
+# NINPUTS each of Switch, Pushbutton, ESwitch and EButton are instantiated:
+# first each polling its own pin, then as members of an InputGroup, then each
+# waiting on its pin's interrupt. Task wakeups are counted by wrapping the
+# scheduler's run queue. Some simulated pins change state to check that events
+# are delivered in each case.
+
+import asyncio
+from primitives import Switch, Pushbutton, ESwitch, EButton, InputGroup
+from .counting import CountingQueue
+
+NINPUTS = 25
+RUNTIME = 1000  # ms
+
+
+class Pin:  # Stub: an input pulled up, supporting interrupts
+    IRQ_FALLING = 1
+    IRQ_RISING = 2
+
+    def __init__(self):
+        self._v = 1
+        self._isr = None
+
+    def __call__(self, v=None):
+        if v is None:
+            return self._v
+        if v != self._v and self._isr is not None:
+            self._isr(self)
+        self._v = v
+
+    value = __call__
+
+    def irq(self, handler=None, trigger=3):
+        self._isr = handler
+
+
+async def measure(group, irq=False):
+    pins = [Pin() for _ in range(4 * NINPUTS)]
+    log = []
+    objs = []
+    for n in range(NINPUTS):
+        sw = Switch(pins[n], group=group, irq=irq)
+        sw.close_func(log.append, ("switch",))
+        pb = Pushbutton(pins[NINPUTS + n], group=group, irq=irq)
+        pb.press_func(log.append, ("pushbutton",))
+        objs.extend((sw, pb))
+        objs.append(ESwitch(pins[2 * NINPUTS + n], group=group, irq=irq))
+        objs.append(EButton(pins[3 * NINPUTS + n], group=group, irq=irq))
+    await asyncio.sleep_ms(0)
+    cq = CountingQueue()
+    cq.install()
+    try:
+        await asyncio.sleep_ms(RUNTIME // 2)
+        for n in (0, NINPUTS, 2 * NINPUTS, 3 * NINPUTS):
+            pins[n](0)  # Close first switch and press first button of each type
+        await asyncio.sleep_ms(RUNTIME // 2)
+    finally:
+        cq.uninstall()
+    ok = sorted(log) == ["pushbutton", "switch"] and objs[2]() and objs[3]()
+    for obj in objs:
+        obj.deinit()
+    return cq.count, ok
+
+
+async def main():
+    n = 4 * NINPUTS
+    print("{} inputs, {}ms.".format(n, RUNTIME))
+    count, ok = await measure(None)
+    print("Polled individually {:5d} wakeups {}".format(count, "Pass" if ok else "Fail"))
+    group = InputGroup()
+    count, ok = await measure(group)
+    print("InputGroup          {:5d} wakeups {}".format(count, "Pass" if ok else "Fail"))
+    print("Group sampled {} times".format(group.ticks))
+    count, ok = await measure(None, True)
+    print("IRQ wake            {:5d} wakeups {}".format(count, "Pass" if ok else "Fail"))
+
+
+try:
+    asyncio.run(main())
+finally:
+    asyncio.new_event_loop()
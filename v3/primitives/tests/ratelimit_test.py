@@ -0,0 +1,109 @@
+# ratelimit_test.py Test RateLimiter, throttle and debounce
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Runs on any target including the Unix build.
+# Usage:
+# import primitives.tests.ratelimit_test
+
+import asyncio
+from time import ticks_ms, ticks_diff
+from primitives import RateLimiter, throttle, debounce
+
+
+def result(name, ok):
+    print("{:30s} {}".format(name, "Pass" if ok else "Fail"))
+
+
+async def limiter_test():
+    # 10 tokens/s, burst of 5: 5 tokens are available at once then one per 100ms
+    rl = RateLimiter(10, 5)
+    t = ticks_ms()
+    for _ in range(5):
+        await rl.acquire()
+    burst = ticks_diff(ticks_ms(), t)
+    for _ in range(10):
+        await rl.acquire()
+    dt = ticks_diff(ticks_ms(), t)
+    print("Burst of 5 took {}ms, 15 tokens took {}ms".format(burst, dt))
+    result("RateLimiter rate", burst < 20 and 950 <= dt < 1100)
+
+    ok = not rl.try_acquire()  # Bucket is empty
+    await asyncio.sleep_ms(210)
+    ok = ok and rl.try_acquire(2) and not rl.try_acquire()
+    result("RateLimiter try_acquire", ok)
+
+    # Tasks are served in the order in which they waited
+    order = []
+
+    async def take(n):
+        await rl.acquire(n)
+        order.append(n)
+
+    await asyncio.sleep_ms(500)  # Refill
+    rl.try_acquire(5)
+    tasks = [asyncio.create_task(take(n)) for n in (3, 1, 2)]
+    await asyncio.sleep_ms(50)
+    ok = not rl.try_acquire()  # Waiting tasks have priority
+    await asyncio.gather(*tasks)
+    result("RateLimiter FIFO", ok and order == [3, 1, 2])
+
+    try:
+        await rl.acquire(6)
+    except ValueError:
+        result("RateLimiter n > burst", True)
+    else:
+        result("RateLimiter n > burst", False)
+
+
+async def wrapper_test():
+    calls = []
+    # Throttle: called every 10ms for 500ms, run at most once per 100ms
+    th = throttle(calls.append, 100)
+    for n in range(50):
+        th(n)
+        await asyncio.sleep_ms(10)
+    await asyncio.sleep_ms(200)
+    print("Throttle ran with", calls)
+    result("throttle", 5 <= len(calls) <= 7 and calls[0] == 0 and calls[-1] == 49)
+    th.deinit()
+
+    # Debounce: three bursts of calls, each gives one run with its latest args
+    calls = []
+    db = debounce(calls.append, 50)
+    for burst in range(3):
+        for n in range(10):
+            db(burst * 10 + n)
+            await asyncio.sleep_ms(10)
+        await asyncio.sleep_ms(100)
+    print("Debounce ran with", calls)
+    result("debounce", calls == [9, 19, 29])
+    db.deinit()
+
+    # Wrappers run coros as per launch
+    done = asyncio.Event()
+
+    async def coro(n):
+        await asyncio.sleep_ms(10)
+        if n == 99:
+            done.set()
+
+    wrappers = [debounce(coro, 20) for _ in range(50)]
+    for n, w in enumerate(wrappers):
+        w(99 if n == 49 else n)
+    await asyncio.wait_for_ms(done.wait(), 200)
+    for w in wrappers:
+        w.deinit()
+    result("debounce with coro", done.is_set())
+
+
+async def main():
+    await limiter_test()
+    await wrapper_test()
+
+
+try:
+    asyncio.run(main())
+finally:
+    asyncio.new_event_loop()
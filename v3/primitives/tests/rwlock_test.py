@@ -0,0 +1,113 @@
+# rwlock_test.py Test/demo/benchmark of RWLock and RLock
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Usage:
+# import primitives.tests.rwlock_test
+
+import asyncio
+from time import ticks_ms, ticks_diff
+from primitives import RWLock, RLock
+
+NREADERS = 20
+
+
+# Functional tests
+
+
+async def rw_demo():
+    lock = RWLock()
+    log = []
+
+    async def reader(n):
+        async with lock.reader:
+            log.append("r{}".format(n))
+            await asyncio.sleep_ms(50)
+
+    async def writer(n):
+        async with lock.writer:
+            log.append("w{}".format(n))
+            await asyncio.sleep_ms(50)
+
+    tasks = [asyncio.create_task(reader(n)) for n in range(3)]
+    await asyncio.sleep_ms(10)
+    tasks.append(asyncio.create_task(writer(0)))  # Waits for readers to finish
+    await asyncio.sleep_ms(10)
+    tasks.append(asyncio.create_task(reader(3)))  # Queues behind waiting writer
+    await asyncio.gather(*tasks)
+    print("RWLock order:", log, "Pass" if log == ["r0", "r1", "r2", "w0", "r3"] else "Fail")
+
+
+async def rlock_demo():
+    lock = RLock()
+
+    async def nested(depth):
+        async with lock:
+            if depth:
+                await nested(depth - 1)
+
+    async def other():
+        async with lock:
+            return True
+
+    await nested(5)
+    print("RLock reentrant:", "Pass" if not lock.locked() else "Fail")
+    await lock.acquire()
+    t = asyncio.create_task(other())
+    await asyncio.sleep_ms(10)
+    blocked = not t.done()
+    lock.release()
+    print("RLock excludes other tasks:", "Pass" if blocked and await t else "Fail")
+
+
+# Benchmark: NREADERS tasks repeatedly read a shared value which takes 2ms to
+# read; one writer updates it every 50ms. Report reads completed in 2s.
+
+
+async def bench(name, acq_read, rel_read, acq_write, rel_write):
+    nreads = 0
+    nwrites = 0
+    stop = False
+
+    async def reader():
+        nonlocal nreads
+        while not stop:
+            await acq_read()
+            await asyncio.sleep_ms(2)
+            rel_read()
+            nreads += 1
+
+    async def writer():
+        nonlocal nwrites
+        while not stop:
+            await asyncio.sleep_ms(50)
+            await acq_write()
+            await asyncio.sleep_ms(2)
+            rel_write()
+            nwrites += 1
+
+    tasks = [asyncio.create_task(reader()) for _ in range(NREADERS)]
+    tasks.append(asyncio.create_task(writer()))
+    t = ticks_ms()
+    await asyncio.sleep(2)
+    stop = True
+    await asyncio.gather(*tasks)
+    dt = ticks_diff(ticks_ms(), t)
+    print("{:8s} {:6d} reads {:4d} writes in {}ms".format(name, nreads, nwrites, dt))
+
+
+async def main():
+    await rw_demo()
+    await rlock_demo()
+    print("Benchmark: {} readers, 1 writer.".format(NREADERS))
+    lock = asyncio.Lock()
+    await bench("Lock", lock.acquire, lock.release, lock.acquire, lock.release)
+    rwl = RWLock()
+    await bench("RWLock", rwl.acquire_read, rwl.release_read, rwl.acquire_write, rwl.release_write)
+
+
+try:
+    asyncio.run(main())
+finally:
+    asyncio.new_event_loop()
@@ -0,0 +1,157 @@
+# sw_array_bench.py Check SwArray events and measure CPU use of key matrices
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Runs on any target including the Unix build: the key matrix is simulated.
+# Usage:
+# import primitives.tests.sw_array_bench
+
+# Event sequences for short, double and long presses are checked. CPU use is
+# estimated by counting iterations of a task which yields to the scheduler and
+# by counting wakeups of the scan task.
+# This is measured for Keyboard and SwArray instances with no key pressed
+# using continuous scanning, the default scan policy and IRQ wake, and for an
+# SwArray with NHELD keys held down.
+
+import asyncio
+from time import ticks_ms, ticks_diff
+from primitives.sw_array import Keyboard, SwArray, CLOSE, OPEN, LONG, DOUBLE, SUPPRESS
+from .counting import CountingQueue
+
+NROWS = 4
+NCOLS = 4
+NHELD = 10
+
+
+class Matrix:  # Simulated key matrix with stub row and column pins
+    def __init__(self):
+        self.held = set()  # (row, col) of closed keys
+        self.rows = [self.Row() for _ in range(NROWS)]
+        self.cols = [self.Col(self, c) for c in range(NCOLS)]
+
+    class Row:
+        def __init__(self):
+            self.v = 1
+
+        def __call__(self, v):
+            self.v = v
+
+    class Col:
+        IRQ_FALLING = 2
+
+        def __init__(self, matrix, c):
+            self._m = matrix
+            self._c = c
+            self.isr = None
+
+        def __call__(self):  # Pulled up unless a closed key connects an asserted row
+            rows = self._m.rows
+            return int(not any(rows[r].v == 0 for r, c in self._m.held if c == self._c))
+
+        def irq(self, handler=None, trigger=2):
+            self.isr = handler
+
+    def key(self, sc):  # Scan code to (row, col)
+        n = NROWS * NCOLS - 1 - sc  # First key scanned has the highest code
+        return divmod(n, NCOLS)
+
+    def press(self, *keys):
+        old = [col() for col in self.cols]
+        self.held.update(keys)
+        for v, col in zip(old, self.cols):
+            if v and not col() and col.isr is not None:  # Falling edge
+                col.isr(col)
+
+    def release(self, *keys):
+        self.held.difference_update(keys)
+
+
+async def events(swa, ms):  # Events occurring in a period
+    await asyncio.sleep_ms(ms)
+    evts = []
+    while not swa.empty():
+        evts.append(swa.get_nowait())
+    return evts
+
+
+async def sequences():
+    m = Matrix()
+    key = m.key(5)
+    for cfg in (CLOSE | OPEN | LONG | DOUBLE, CLOSE | OPEN | LONG | DOUBLE | SUPPRESS):
+        swa = SwArray(m.rows, m.cols, cfg)
+        print("SUPPRESS" if cfg & SUPPRESS else "Default")
+        m.press(key)  # Short press
+        await asyncio.sleep_ms(100)
+        m.release(key)
+        print("Short ", [e for _, e in await events(swa, 600)])
+        m.press(key)  # Double click
+        await asyncio.sleep_ms(100)
+        m.release(key)
+        await asyncio.sleep_ms(100)
+        m.press(key)
+        await asyncio.sleep_ms(100)
+        m.release(key)
+        print("Double", [e for _, e in await events(swa, 600)])
+        m.press(key)  # Long press
+        await asyncio.sleep_ms(1200)
+        m.release(key)
+        print("Long  ", [e for _, e in await events(swa, 600)])
+        swa.deinit()
+    print("Events: CLOSE {} OPEN {} LONG {} DOUBLE {}".format(CLOSE, OPEN, LONG, DOUBLE))
+
+
+async def spin(ms, task=None):  # Count iterations of a task yielding to the scheduler
+    n = 0
+    cq = CountingQueue((task,))
+    cq.install()
+    t = ticks_ms()
+    try:
+        while ticks_diff(ticks_ms(), t) < ms:
+            await asyncio.sleep_ms(0)
+            n += 1
+    finally:
+        cq.uninstall()
+    return n, cq.count
+
+
+async def cpu():
+    base, _ = await spin(1000)  # No key matrix
+    print("Loops/s with no key matrix {}".format(base))
+    print("{:26s} {:>7s} {:>6s} {:>8s}".format("", "Loops/s", "%", "Wakeups"))
+
+    def report(name, res):
+        n, w = res
+        print("{:26s} {:7d} {:5d}% {:8d}".format(name, n, n * 100 // base, w))
+
+    policies = (("continuous", {"idle_ms": 0}), ("default", {}), ("IRQ", {"irq": True}))
+    for cls, args in ((Keyboard, ()), (SwArray, (CLOSE | OPEN | LONG | DOUBLE,))):
+        for policy, kwargs in policies:
+            m = Matrix()
+            obj = cls(m.rows, m.cols, *args, active_ms=100, **kwargs)
+            await asyncio.sleep_ms(200)  # Allow active period to elapse
+            res = await spin(1000, obj._run)
+            m.press(m.key(3))  # Check the key is detected
+            await asyncio.sleep_ms(20)
+            ok = obj[3]
+            obj.deinit()
+            report("{} {}".format(cls.__name__, policy), res)
+            if not ok:
+                print("Fail: key press missed")
+    m = Matrix()
+    swa = SwArray(m.rows, m.cols, CLOSE | OPEN | LONG | DOUBLE, bufsize=100, active_ms=100)
+    m.press(*(m.key(sc) for sc in range(NHELD)))
+    await asyncio.sleep_ms(200)
+    report("SwArray {} keys held".format(NHELD), await spin(1000, swa._run))
+    swa.deinit()
+
+
+async def main():
+    await sequences()
+    await cpu()
+
+
+try:
+    asyncio.run(main())
+finally:
+    asyncio.new_event_loop()
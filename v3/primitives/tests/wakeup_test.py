@@ -0,0 +1,79 @@
+# wakeup_test.py Measure task wakeups per item for Queue, RingbufQueue and Semaphore
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Usage:
+# import primitives.tests.wakeup_test
+
+# NTASKS consumers wait on one queue (or semaphore) while a producer supplies
+# NITEMS items one at a time. Wakeups of the consumer tasks are counted by
+# wrapping the scheduler's run queue. Ideally each item costs one wakeup and
+# the consumers are served in turn.
+
+import asyncio
+from primitives import Queue, RingbufQueue, Semaphore
+from .counting import CountingQueue
+
+NTASKS = 10
+NITEMS = 200
+
+
+async def measure(name, consume, produce):
+    got = []
+    tasks = [asyncio.create_task(consume(n, got)) for n in range(NTASKS)]
+    await asyncio.sleep_ms(10)  # All consumers are now waiting
+    cq = CountingQueue(tasks)
+    cq.install()
+    try:
+        for n in range(NITEMS):
+            await produce(n)
+            await asyncio.sleep_ms(0)
+        await asyncio.sleep_ms(10)
+    finally:
+        cq.uninstall()
+    for t in tasks:
+        t.cancel()
+    await asyncio.sleep_ms(0)
+    ok = sorted(v for _, v in got) == list(range(NITEMS))
+    # With FIFO handoff waiting tasks are served in turn
+    fifo = all(got[n][0] == got[n - NTASKS][0] for n in range(NTASKS, NITEMS))
+    print("{:14s} {:5.2f} wakeups/item FIFO {} {}".format(name, cq.count / NITEMS, fifo, "Pass" if ok else "Fail"))
+
+
+async def main():
+    print("{} waiting tasks, {} items.".format(NTASKS, NITEMS))
+
+    q = Queue()
+
+    async def qget(n, got):
+        while True:
+            got.append((n, await q.get()))
+
+    await measure("Queue", qget, q.put)
+
+    rq = RingbufQueue(NITEMS + 1)
+
+    async def rget(n, got):
+        async for v in rq:
+            got.append((n, v))
+
+    await measure("RingbufQueue", rget, rq.put)
+
+    sema = Semaphore(0)
+
+    async def acquire(n, got):
+        while True:
+            await sema.acquire()
+            got.append((n, len(got)))
+
+    async def release(n):
+        sema.release()
+
+    await measure("Semaphore", acquire, release)
+
+
+try:
+    asyncio.run(main())
+finally:
+    asyncio.new_event_loop()
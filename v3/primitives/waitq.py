@@ -0,0 +1,42 @@
+# waitq.py Single-waiter handoff queue of tasks, used by primitives
+
+# Copyright (c) 2026 Peter Hinch
+# Released under the MIT License (MIT) - see LICENSE file
+
+# Waiting tasks are held in FIFO order on a TaskQueue as in asyncio.Lock, so
+# waiting involves no allocation. wake() schedules only the first waiter. While
+# that task is scheduled but has yet to run, further calls to wake() do nothing:
+# the woken task calls wake() again if the resource is still available. Thus a
+# resource passed to a waiter costs one wakeup however many tasks are waiting,
+# and a task arriving while a woken task is pending cannot jump the queue.
+
+from asyncio import core
+
+
+class WaitQueue:
+    def __init__(self):
+        self._q = core.TaskQueue()
+        self._woken = None  # Task scheduled by wake() which has yet to run
+
+    def waiting(self):  # True if a task is waiting or about to resume
+        return self._woken is not None or self._q.peek() is not None
+
+    def wake(self):  # Schedule the first waiting task
+        if self._woken is None and self._q.peek():
+            self._woken = self._q.pop()
+            core._task_queue.push(self._woken)
+
+    # async
+    def wait(self):  # Pause until woken
+        t = core.cur_task
+        self._q.push(t)
+        # Set calling task's data to the queue so it can be removed if needed
+        t.data = self._q
+        try:
+            yield
+        except core.CancelledError as er:
+            if self._woken is t:  # Cancelled while pending on resume
+                self._woken = None
+                self.wake()  # Pass the wakeup on
+            raise er
+        self._woken = None
@@ -0,0 +1,14 @@
+# Freeze the threadsafe package into firmware. Add to a board manifest with:
+# include("<path to micropython-async>/v3/threadsafe/manifest.py")
+package(
+    "threadsafe",
+    (
+        "__init__.py",
+        "context.py",
+        "message.py",
+        "threadsafe_event.py",
+        "threadsafe_queue.py",
+    ),
+    base_path="..",
+    opt=3,
+)
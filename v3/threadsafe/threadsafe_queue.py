@@ -46,6 +46,23 @@ class ThreadSafeQueue:  # MicroPython optimised
             pass  # can't bump ._wi until an item is removed
         self._wi = (self._wi + 1) % self._size
 
+    # Copy items from buf to the queue, returning the number copied. Copying stops
+    # when the queue is full. Does not allocate, so may be called from a hard ISR.
+    def put_from(self, buf):
+        q = self._q
+        size = self._size
+        wi = self._wi
+        n = min(len(buf), (self._ri - wi - 1) % size)
+        for i in range(n):
+            q[wi] = buf[i]
+            wi += 1
+            if wi == size:
+                wi = 0
+        self._wi = wi  # Items become visible to the consumer in one step
+        if n:
+            self._evput.set()  # Schedule task waiting on get
+        return n
+
     async def put(self, val):  # Usage: await queue.put(item)
         while self.full():  # Queue full
             await self._evget.wait()
@@ -64,3 +81,20 @@ class ThreadSafeQueue:  # MicroPython optimised
         self._ri = (self._ri + 1) % self._size
         self._evget.set()  # Schedule task waiting on ._evget
         return r
+
+    # Wait until the queue is not empty, then copy as many items as are available
+    # into buf (up to its length), returning the number copied.
+    async def get_into(self, buf):
+        while self.empty():
+            await self._evput.wait()
+        q = self._q
+        size = self._size
+        ri = self._ri
+        n = min(len(buf), self.qsize())
+        k = min(n, size - ri)  # Number before wrap
+        buf[:k] = q[ri : ri + k]
+        if n > k:
+            buf[k:n] = q[: n - k]
+        self._ri = (ri + n) % size
+        self._evget.set()  # Schedule task waiting on ._evget
+        return n